@@ -1,28 +1,64 @@
 import numpy as np
 import math
+from profiler import timed
+
+# Размер блока строк для поворота на месте: временный буфер matmul
+# ограничен блоком, а не всем массивом вершин
+_INPLACE_BLOCK_ROWS = 65536
 
 class AffineTransform:
-    def __init__(self):
-        pass
+    def __init__(self, dtype=None):
+        """
+        Args:
+            dtype: Vertex dtype policy. None keeps the dtype of the input
+                   (float32 meshes stay float32), otherwise inputs are cast to it.
+        """
+        self.dtype = dtype
+    
+    def _as_array(self, vertices):
+        """Convert input to an array of the configured dtype without copying if possible"""
+        vertices = np.asarray(vertices)
+        if self.dtype is not None:
+            return vertices.astype(self.dtype, copy=False)
+        if not np.issubdtype(vertices.dtype, np.floating):
+            return vertices.astype(np.float64)
+        return vertices
+    
+    def _matmul_rows(self, vertices, matrix, out):
+        """vertices @ matrix, writing into out (which may alias vertices)"""
+        if out is not None and np.shares_memory(vertices, out):
+            # matmul копирует перекрывающийся вход целиком, поэтому идем блоками
+            for start in range(0, len(vertices), _INPLACE_BLOCK_ROWS):
+                stop = start + _INPLACE_BLOCK_ROWS
+                np.matmul(vertices[start:stop], matrix, out=out[start:stop])
+            return out
+        return np.matmul(vertices, matrix, out=out)
     
-    def translate(self, vertices, dx, dy, dz):
-        """Translate vertices by (dx, dy, dz)"""
+    def _update_analysis(self, analysis, matrix, result):
+        """Bring a MeshAnalysis of the input up to date with the transformed vertices"""
+        if analysis is not None:
+            analysis.transform(matrix, result)
+        return result
+    
+    @timed("AffineTransform.translate")
+    def translate(self, vertices, dx, dy, dz, out=None, analysis=None):
+        """
+        Translate vertices by (dx, dy, dz)
+        
+        Pass out=vertices to transform in place without allocating.
+        analysis (MeshAnalysis of vertices) is updated to describe the result.
+        """
         if len(vertices) == 0:
             return vertices
-            
-        # Простое сложение - правильный способ для перемещения
-        translated_vertices = vertices.copy()
-        translated_vertices[:, 0] += dx  # X
-        translated_vertices[:, 1] += dy  # Y  
-        translated_vertices[:, 2] += dz  # Z
         
-        return translated_vertices
+        vertices = self._as_array(vertices)
+        # Простое сложение - правильный способ для перемещения
+        offset = np.array([dx, dy, dz], dtype=vertices.dtype)
+        result = np.add(vertices, offset, out=out)
+        return self._update_analysis(analysis, self.translation_matrix(dx, dy, dz), result)
     
-    def rotate(self, vertices, rx, ry, rz):
-        """Rotate vertices by rx, ry, rz degrees around X, Y, Z axes"""
-        if len(vertices) == 0:
-            return vertices
-            
+    def rotation_matrix(self, rx, ry, rz):
+        """Return the 3x3 rotation matrix for rx, ry, rz degrees (applied X, then Y, then Z)"""
         # Convert to radians
         rx_rad = math.radians(rx)
         ry_rad = math.radians(ry)
@@ -48,41 +84,222 @@ class AffineTransform:
         ])
         
         # Combine rotations (правильный порядок: Z * Y * X)
-        rotation_matrix = rot_z @ rot_y @ rot_x
+        return rot_z @ rot_y @ rot_x
+    
+    @timed("AffineTransform.rotate")
+    def rotate(self, vertices, rx, ry, rz, out=None, analysis=None):
+        """
+        Rotate vertices by rx, ry, rz degrees around X, Y, Z axes
         
-        # Apply rotation
-        rotated_vertices = vertices @ rotation_matrix.T
+        Pass out=vertices to transform in place.
+        analysis (MeshAnalysis of vertices) is updated to describe the result.
+        """
+        if len(vertices) == 0:
+            return vertices
+        
+        vertices = self._as_array(vertices)
+        rotation_matrix = self.rotation_matrix(rx, ry, rz).astype(vertices.dtype)
         
-        return rotated_vertices
+        # Apply rotation
+        result = self._matmul_rows(vertices, rotation_matrix.T, out)
+        return self._update_analysis(analysis, self.rotation_matrix4(rx, ry, rz), result)
     
-    def scale(self, vertices, sx, sy, sz):
-        """Scale vertices by (sx, sy, sz) relative to model center"""
+    @timed("AffineTransform.scale")
+    def scale(self, vertices, sx, sy, sz, out=None, center=None, analysis=None):
+        """
+        Scale vertices by (sx, sy, sz) relative to model center
+        
+        Pass out=vertices to transform in place without allocating.
+        center overrides the mean of the vertices if it is already known;
+        with analysis (MeshAnalysis of vertices) its cached centroid is used
+        and the analysis is updated to describe the result.
+        """
         if len(vertices) == 0:
             return vertices
-            
+        
+        vertices = self._as_array(vertices)
         # Масштабирование относительно центра модели
-        center = np.mean(vertices, axis=0)
+        if center is None:
+            center = analysis.centroid if analysis is not None else np.mean(vertices, axis=0)
+        scale_matrix = self.scale_matrix(sx, sy, sz, center)
+        center = np.asarray(center, dtype=vertices.dtype)
+        factors = np.array([sx, sy, sz], dtype=vertices.dtype)
         
         # Сначала перемещаем в начало координат, масштабируем, затем возвращаем обратно
-        vertices_centered = vertices - center
+        out = np.subtract(vertices, center, out=out)
+        out *= factors
+        out += center
+        return self._update_analysis(analysis, scale_matrix, out)
+
+    @timed("AffineTransform.scale_origin")
+    def scale_origin(self, vertices, sx, sy, sz, out=None, analysis=None):
+        """
+        Scale vertices relative to origin (0,0,0)
         
-        # Простое умножение для масштабирования
-        vertices_scaled = vertices_centered.copy()
-        vertices_scaled[:, 0] *= sx  # X
-        vertices_scaled[:, 1] *= sy  # Y
-        vertices_scaled[:, 2] *= sz  # Z
+        Pass out=vertices to transform in place without allocating.
+        analysis (MeshAnalysis of vertices) is updated to describe the result.
+        """
+        if len(vertices) == 0:
+            return vertices
         
-        return vertices_scaled + center
+        vertices = self._as_array(vertices)
+        # Простое умножение для масштабирования относительно начала координат
+        factors = np.array([sx, sy, sz], dtype=vertices.dtype)
+        result = np.multiply(vertices, factors, out=out)
+        return self._update_analysis(analysis, self.scale_matrix(sx, sy, sz), result)
 
-    def scale_origin(self, vertices, sx, sy, sz):
-        """Scale vertices relative to origin (0,0,0)"""
+    # ------------------------------------------------------------------
+    # Homogeneous 4x4 matrices of the single-mesh operations
+    # ------------------------------------------------------------------
+    
+    def translation_matrix(self, dx, dy, dz):
+        """Return the 4x4 matrix equivalent to translate(dx, dy, dz)"""
+        matrix = np.eye(4)
+        matrix[:3, 3] = (dx, dy, dz)
+        return matrix
+    
+    def rotation_matrix4(self, rx, ry, rz):
+        """Return the 4x4 matrix equivalent to rotate(rx, ry, rz)"""
+        matrix = np.eye(4)
+        matrix[:3, :3] = self.rotation_matrix(rx, ry, rz)
+        return matrix
+    
+    def scale_matrix(self, sx, sy, sz, center=(0.0, 0.0, 0.0)):
+        """Return the 4x4 matrix scaling by (sx, sy, sz) about center"""
+        factors = np.array([sx, sy, sz], dtype=np.float64)
+        center = np.asarray(center, dtype=np.float64)
+        matrix = np.diag(np.append(factors, 1.0))
+        matrix[:3, 3] = center - factors * center
+        return matrix
+    
+    @timed("AffineTransform.apply_matrix")
+    def apply_matrix(self, vertices, matrix, out=None, analysis=None):
+        """
+        Apply one homogeneous 4x4 matrix to vertices (N, 3)
+        
+        analysis (MeshAnalysis of vertices) is updated to describe the result.
+        """
         if len(vertices) == 0:
             return vertices
-            
-        # Простое умножение для масштабирования относительно начала координат
-        scaled_vertices = vertices.copy()
-        scaled_vertices[:, 0] *= sx  # X
-        scaled_vertices[:, 1] *= sy  # Y
-        scaled_vertices[:, 2] *= sz  # Z
         
-        return scaled_vertices
\ No newline at end of file
+        vertices = self._as_array(vertices)
+        cast = np.asarray(matrix, dtype=vertices.dtype)
+        out = self._matmul_rows(vertices, cast[:3, :3].T, out)
+        out += cast[:3, 3]
+        return self._update_analysis(analysis, matrix, out)
+    
+    # ------------------------------------------------------------------
+    # Batched API: K parameter sets applied to one or many meshes at once
+    # ------------------------------------------------------------------
+    
+    def rotation_matrices(self, angles):
+        """
+        Build rotation matrices for many poses at once
+        
+        Args:
+            angles: Array (K, 3) of rx, ry, rz angles in degrees
+        
+        Returns:
+            Array (K, 3, 3) with the same Z * Y * X order as rotation_matrix()
+        """
+        angles = np.radians(np.asarray(angles, dtype=np.float64).reshape(-1, 3))
+        cos = np.cos(angles)
+        sin = np.sin(angles)
+        cx, cy, cz = cos[:, 0], cos[:, 1], cos[:, 2]
+        sx, sy, sz = sin[:, 0], sin[:, 1], sin[:, 2]
+        
+        # Развернутое произведение rot_z @ rot_y @ rot_x
+        matrices = np.empty((len(angles), 3, 3))
+        matrices[:, 0, 0] = cz * cy
+        matrices[:, 0, 1] = cz * sy * sx - sz * cx
+        matrices[:, 0, 2] = cz * sy * cx + sz * sx
+        matrices[:, 1, 0] = sz * cy
+        matrices[:, 1, 1] = sz * sy * sx + cz * cx
+        matrices[:, 1, 2] = sz * sy * cx - cz * sx
+        matrices[:, 2, 0] = -sy
+        matrices[:, 2, 1] = cy * sx
+        matrices[:, 2, 2] = cy * cx
+        return matrices
+    
+    def compose_matrices(self, translations=None, rotations=None, scales=None):
+        """
+        Build homogeneous 4x4 matrices M = T * R * S for K instances
+        
+        Args:
+            translations: Array (K, 3) of dx, dy, dz (optional)
+            rotations: Array (K, 3) of rx, ry, rz in degrees (optional)
+            scales: Array (K, 3) of sx, sy, sz relative to origin (optional)
+        
+        Returns:
+            Array (K, 4, 4)
+        """
+        params = [p for p in (translations, rotations, scales) if p is not None]
+        if not params:
+            raise ValueError("At least one of translations, rotations, scales is required")
+        count = len(np.asarray(params[0]).reshape(-1, 3))
+        
+        matrices = np.zeros((count, 4, 4))
+        matrices[:, 3, 3] = 1.0
+        if rotations is not None:
+            matrices[:, :3, :3] = self.rotation_matrices(rotations)
+        else:
+            matrices[:, :3, :3] = np.eye(3)
+        if scales is not None:
+            # R * diag(s) масштабирует столбцы матрицы поворота
+            matrices[:, :3, :3] *= np.asarray(scales, dtype=np.float64).reshape(-1, 1, 3)
+        if translations is not None:
+            matrices[:, :3, 3] = np.asarray(translations, dtype=np.float64).reshape(-1, 3)
+        return matrices
+    
+    @timed("AffineTransform.apply_matrices")
+    def apply_matrices(self, vertices, matrices, out=None):
+        """
+        Apply K homogeneous 4x4 matrices to one or many meshes with one einsum
+        
+        Args:
+            vertices: Array (N, 3) for a single mesh, or (K, N, 3) with one mesh per matrix
+            matrices: Array (K, 4, 4)
+            out: Optional preallocated array (K, N, 3) to write into
+        
+        Returns:
+            Array (K, N, 3) of transformed vertices
+        """
+        vertices = self._as_array(vertices)
+        matrices = np.asarray(matrices, dtype=vertices.dtype).reshape(-1, 4, 4)
+        linear = matrices[:, :3, :3]
+        offsets = matrices[:, :3, 3]
+        
+        if vertices.ndim == 2:
+            # Одна модель, много поз: (K, N, 3)
+            out = np.einsum('nj,kij->kni', vertices, linear, out=out)
+        elif vertices.ndim == 3:
+            if len(vertices) != len(matrices):
+                raise ValueError("Number of meshes must match number of matrices")
+            out = np.einsum('knj,kij->kni', vertices, linear, out=out)
+        else:
+            raise ValueError("Vertices must have shape (N, 3) or (K, N, 3)")
+        
+        out += offsets[:, np.newaxis, :]
+        return out
+    
+    @timed("AffineTransform.batch_translate")
+    def batch_translate(self, vertices, offsets, out=None):
+        """Translate one mesh (N, 3) or K meshes (K, N, 3) by K offsets (K, 3)"""
+        vertices = self._as_array(vertices)
+        offsets = np.asarray(offsets, dtype=vertices.dtype).reshape(-1, 3)
+        if vertices.ndim == 2:
+            vertices = vertices[np.newaxis, :, :]
+        return np.add(vertices, offsets[:, np.newaxis, :], out=out)
+    
+    def batch_rotate(self, vertices, angles, out=None):
+        """Rotate one mesh (N, 3) or K meshes (K, N, 3) by K angle triples (K, 3) in degrees"""
+        return self.apply_matrices(vertices, self.compose_matrices(rotations=angles), out=out)
+    
+    @timed("AffineTransform.batch_scale_origin")
+    def batch_scale_origin(self, vertices, factors, out=None):
+        """Scale one mesh (N, 3) or K meshes (K, N, 3) by K factor triples (K, 3) about the origin"""
+        vertices = self._as_array(vertices)
+        factors = np.asarray(factors, dtype=vertices.dtype).reshape(-1, 3)
+        if vertices.ndim == 2:
+            vertices = vertices[np.newaxis, :, :]
+        return np.multiply(vertices, factors[:, np.newaxis, :], out=out)
@@ -0,0 +1,210 @@
+"""
+Offscreen batch renderer: PNG previews for every model in a directory.
+
+Models (OBJ, PLY, STL) are drawn with the same wireframe plot as the
+viewer on an Agg figure, without Tk. Each worker process creates its
+figure once and reuses it for every model and camera.
+
+Usage:
+    python batch_render.py models previews
+    python batch_render.py assets thumbs --cameras iso,front,top --size 320x240 --workers 4
+    python batch_render.py assets thumbs --cameras "iso,30:45" --max-edges 20000
+"""
+import argparse
+import glob
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import matplotlib
+matplotlib.use("Agg")
+
+from model_loader import OBJLoader, PLYLoader, STLLoader
+from mesh_analysis import MeshAnalysis
+from wireframe_plot import draw_wireframe
+
+MODEL_EXTENSIONS = (".obj", ".ply", ".stl")
+
+# Именованные камеры: (угол возвышения, азимут) в градусах
+CAMERAS = {
+    "iso": (30, -60),
+    "front": (0, -90),
+    "back": (0, 90),
+    "side": (0, 0),
+    "top": (90, -90),
+}
+DEFAULT_CAMERAS = "iso,front,side,top"
+
+def parse_cameras(text):
+    """
+    Parse a comma separated camera list
+
+    Items are preset names (see CAMERAS) or "elev:azim" in degrees.
+
+    Returns:
+        List of (name, elev, azim)
+    """
+    cameras = []
+    for item in text.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        if item in CAMERAS:
+            cameras.append((item,) + CAMERAS[item])
+        else:
+            try:
+                elev, azim = (float(value) for value in item.split(":"))
+            except ValueError:
+                raise ValueError(f"Unknown camera '{item}': use a preset "
+                                 f"({', '.join(CAMERAS)}) or elev:azim") from None
+            cameras.append((f"e{elev:g}_a{azim:g}", elev, azim))
+    if not cameras:
+        raise ValueError("No cameras given")
+    return cameras
+
+def find_models(directory, recursive=False):
+    """Model files in directory, sorted by name"""
+    pattern = os.path.join(directory, "**", "*") if recursive else os.path.join(directory, "*")
+    return sorted(path for path in glob.glob(pattern, recursive=recursive)
+                  if os.path.splitext(path)[1].lower() in MODEL_EXTENSIONS)
+
+def load_model(filename, dtype=np.float64):
+    """Load vertices and faces of an OBJ, PLY or STL file"""
+    extension = os.path.splitext(filename)[1].lower()
+    if extension == ".ply":
+        return PLYLoader(dtype).load_ply(filename)
+    if extension == ".stl":
+        return STLLoader(dtype).load_stl(filename)
+    data = OBJLoader(dtype).parse(filename, triangulate=True)
+    return data.vertices, data.faces
+
+class OffscreenRenderer:
+    """One Agg figure reused for every model and camera"""
+
+    def __init__(self, size=(400, 300), dpi=100, max_edges=None, max_points=None):
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+        width, height = size
+        self.dpi = dpi
+        self.max_edges = max_edges
+        self.max_points = max_points
+        self.fig = Figure(figsize=(width / dpi, height / dpi), dpi=dpi)
+        self.canvas = FigureCanvasAgg(self.fig)
+        self.ax = self.fig.add_subplot(111, projection="3d")
+
+    def draw(self, vertices, faces, title, analysis=None):
+        """Draw one model onto the figure without saving it"""
+        if analysis is None:
+            analysis = MeshAnalysis(vertices, faces)
+        draw_wireframe(self.ax, vertices, analysis.edges, title, analysis.bounds,
+                       max_edges=self.max_edges, max_points=self.max_points)
+
+    def render(self, vertices, faces, title, cameras, output_prefix):
+        """
+        Draw one model and save a PNG per camera
+
+        Returns:
+            List of written filenames
+        """
+        self.draw(vertices, faces, title)
+
+        written = []
+        for name, elev, azim in cameras:
+            # Модель рисуется один раз, для каждой камеры меняется только вид
+            self.ax.view_init(elev=elev, azim=azim)
+            filename = f"{output_prefix}_{name}.png"
+            self.fig.savefig(filename, dpi=self.dpi)
+            written.append(filename)
+        return written
+
+# Рендерер рабочего процесса создается один раз в initializer
+_worker_renderer = None
+
+def _init_worker(size, dpi, max_edges, max_points):
+    global _worker_renderer
+    _worker_renderer = OffscreenRenderer(size, dpi, max_edges, max_points)
+
+def _render_file(filename, output_prefix, cameras):
+    """Worker: render one model; returns (filename, images, error)"""
+    try:
+        vertices, faces = load_model(filename)
+        written = _worker_renderer.render(vertices, faces, os.path.basename(filename), cameras,
+                                          output_prefix)
+        return filename, len(written), None
+    except Exception as e:
+        return filename, 0, str(e)
+
+def render_directory(input_dir, output_dir, cameras, size=(400, 300), dpi=100, workers=1,
+                     max_edges=None, max_points=None, recursive=False):
+    """
+    Render every model of input_dir into output_dir
+
+    Returns:
+        dict with models, images, failures [(filename, error)], seconds and models_per_second
+    """
+    files = find_models(input_dir, recursive)
+    os.makedirs(output_dir, exist_ok=True)
+    # Префикс - путь с расширением (cube.obj_iso.png): файлы из подкаталогов
+    # и модели с одинаковым именем в разных форматах не перезаписывают друг друга
+    prefixes = [os.path.join(output_dir, os.path.relpath(filename, input_dir).replace(os.sep, "_"))
+                for filename in files]
+    init_args = (size, dpi, max_edges, max_points)
+
+    begin = time.perf_counter()
+    if workers <= 1 or len(files) <= 1:
+        _init_worker(*init_args)
+        results = [_render_file(filename, prefix, cameras) for filename, prefix in zip(files, prefixes)]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=init_args) as pool:
+            # Небольшие пачки файлов уменьшают накладные расходы на передачу задач
+            chunksize = max(1, len(files) // (workers * 4))
+            results = list(pool.map(_render_file, files, prefixes, [cameras] * len(files),
+                                    chunksize=chunksize))
+    seconds = time.perf_counter() - begin
+
+    rendered = sum(1 for _, _, error in results if error is None)
+    return {
+        "models": rendered,
+        "images": sum(images for _, images, _ in results),
+        "failures": [(filename, error) for filename, _, error in results if error is not None],
+        "seconds": seconds,
+        "models_per_second": rendered / seconds if seconds > 0 else 0.0,
+    }
+
+def parse_size(text):
+    width, height = (int(value) for value in text.lower().split("x"))
+    return width, height
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render PNG previews of every model in a directory")
+    parser.add_argument("input_dir", help="Directory with .obj/.ply/.stl files")
+    parser.add_argument("output_dir", help="Directory for the PNG files")
+    parser.add_argument("--cameras", default=DEFAULT_CAMERAS,
+                        help=f"Comma separated presets ({', '.join(CAMERAS)}) or elev:azim pairs")
+    parser.add_argument("--size", type=parse_size, default=(400, 300), help="Image size WIDTHxHEIGHT")
+    parser.add_argument("--dpi", type=int, default=100)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes")
+    parser.add_argument("--max-edges", type=int, help="Decimate large models to about this many edges")
+    parser.add_argument("--max-points", type=int, help="Draw at most about this many vertex points")
+    parser.add_argument("--recursive", action="store_true", help="Include subdirectories")
+    args = parser.parse_args(argv)
+
+    try:
+        cameras = parse_cameras(args.cameras)
+    except ValueError as e:
+        parser.error(str(e))
+
+    report = render_directory(args.input_dir, args.output_dir, cameras, args.size, args.dpi,
+                              args.workers, args.max_edges, args.max_points, args.recursive)
+    for filename, error in report["failures"]:
+        print(f"FAILED {filename}: {error}")
+    print(f"{report['models']} models, {report['images']} images in {report['seconds']:.2f} s "
+          f"({report['models_per_second']:.2f} models/s, {args.workers} workers)")
+    return 1 if report["failures"] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,261 @@
+"""
+Reproducible benchmark of the public entry points of the viewer.
+
+Meshes are synthesized at several scales with the generators and written
+with OBJWriter, then every loader, generator, transform, the writers and
+the viewer's wireframe plot on an offscreen (Agg) figure are timed. Peak
+traced memory is recorded in a separate run so tracing does not distort
+the timings.
+
+Usage:
+    python benchmark.py                           # 10^3, 10^4, 10^5 triangles
+    python benchmark.py --scales 1e3,1e5,1e7 --render-max 2e4
+    python benchmark.py --save-baseline bench_baseline.json
+    python benchmark.py --baseline bench_baseline.json --tolerance 0.25
+"""
+import argparse
+import gc
+import json
+import math
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import matplotlib
+matplotlib.use("Agg")
+
+from model_loader import OBJLoader, PLYLoader, STLLoader
+from rotation_surface import RotationSurface, IncrementalRotationSurface
+from function_surface import FunctionSurface
+from affine_transformations import AffineTransform
+from obj_writer import OBJWriter
+from ply_writer import PLYWriter
+from stl_writer import STLWriter
+from parallel_loader import ParallelOBJLoader
+from mesh_analysis import MeshAnalysis
+from spatial_hash import SpatialHash
+from batch_render import OffscreenRenderer
+
+DEFAULT_SCALES = "1e3,1e4,1e5"
+DEFAULT_RENDER_MAX = 2e4   # отрисовка Agg остается самой медленной частью на больших сценах
+DEFAULT_TOLERANCE = 0.25
+NOISE_FLOOR_SECONDS = 1e-3  # разница во времени меньше этой считается шумом
+
+# Режимы единого парсера OBJ
+PARSE_MODES = {
+    "triangles": dict(triangulate=True),
+    "polygons": dict(triangulate=False),
+    "uv+normals": dict(triangulate=True, keep_uv=True, keep_normals=True),
+    "strict": dict(triangulate=True, strict=True),
+}
+
+def rotation_params(triangles):
+    """Profile length and segment count giving about `triangles` triangles"""
+    # 2 * segments * (profile_len - 1) треугольников
+    side = max(2, int(round(math.sqrt(triangles / 2))))
+    return side + 1, side
+
+def function_subdivisions(triangles):
+    # 2 * (n - 1)^2 треугольников
+    return max(2, int(round(math.sqrt(triangles / 2))) + 1)
+
+def sphere_profile(count):
+    angles = np.linspace(0, math.pi, count)
+    return [(math.sin(a), math.cos(a)) for a in angles]
+
+class Benchmark:
+    def __init__(self, repeat=3, measure_memory=True):
+        self.repeat = repeat
+        self.measure_memory = measure_memory
+        self.results = {}
+
+    def measure(self, name, scale, func, setup=None):
+        """
+        Time func() (best of `repeat`) and its peak traced memory
+
+        setup() is called before every run and its result passed to func,
+        so in-place operations always start from the same data.
+        """
+        times = []
+        for _ in range(self.repeat):
+            argument = setup() if setup else None
+            gc.collect()
+            begin = time.perf_counter()
+            func(argument) if setup else func()
+            times.append(time.perf_counter() - begin)
+
+        peak = None
+        if self.measure_memory:
+            argument = setup() if setup else None
+            gc.collect()
+            tracemalloc.start()
+            func(argument) if setup else func()
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+        key = f"{name}@{scale}"
+        self.results[key] = {"name": name, "triangles": scale,
+                             "seconds": min(times), "peak_bytes": peak}
+        peak_text = f"{peak / 1024 / 1024:9.2f} MB" if peak is not None else "         -"
+        print(f"{name:40s} {scale:>10d} {min(times) * 1000:12.2f} ms {peak_text}")
+        return self.results[key]
+
+def run_scale(bench, triangles, workdir, render_max, worker_counts):
+    profile_len, segments = rotation_params(triangles)
+    subdivisions = function_subdivisions(triangles)
+    profile = sphere_profile(profile_len)
+
+    rotation = RotationSurface()
+    function = FunctionSurface()
+    bench.measure("RotationSurface.create_rotation_surface", triangles,
+                  lambda: rotation.create_rotation_surface(profile, "y", segments))
+    bench.measure("FunctionSurface.create_function_surface", triangles,
+                  lambda: function.create_function_surface("np.sin(x) * np.cos(y)", (-3, 3), (-3, 3),
+                                                           subdivisions))
+
+    # Интерактивная правка: одна точка образующей при неизменной топологии
+    incremental = IncrementalRotationSurface()
+    incremental.update(profile, "y", segments)
+    edited = list(profile)
+    def edit_point():
+        edited[1] = (edited[1][0] * 1.01, edited[1][1])
+        incremental.update(edited, "y", segments)
+    bench.measure("IncrementalRotationSurface.update(point)", triangles, edit_point)
+
+    vertices, faces = rotation.create_rotation_surface(profile, "y", segments)
+    filename = os.path.join(workdir, f"mesh_{triangles}.obj")
+    writer = OBJWriter()
+    bench.measure("OBJWriter.write_obj", triangles,
+                  lambda: writer.write_obj(filename, vertices, faces))
+
+    ply_filename = os.path.join(workdir, f"mesh_{triangles}.ply")
+    stl_filename = os.path.join(workdir, f"mesh_{triangles}.stl")
+    bench.measure("PLYWriter.write_ply", triangles,
+                  lambda: PLYWriter().write_ply(ply_filename, vertices, faces))
+    bench.measure("STLWriter.write_stl", triangles,
+                  lambda: STLWriter().write_stl(stl_filename, vertices, faces))
+    bench.measure("PLYLoader.load_ply", triangles, lambda: PLYLoader().load_ply(ply_filename))
+    bench.measure("STLLoader.load_stl", triangles, lambda: STLLoader().load_stl(stl_filename))
+
+    loader = OBJLoader()
+    bench.measure("OBJLoader.load_obj", triangles, lambda: loader.load_obj(filename))
+    bench.measure("OBJLoader.load_obj_advanced", triangles, lambda: loader.load_obj_advanced(filename))
+    bench.measure("OBJLoader.load_simple_obj", triangles, lambda: loader.load_simple_obj(filename))
+    for mode, options in PARSE_MODES.items():
+        bench.measure(f"OBJLoader.parse[{mode}]", triangles,
+                      lambda options=options: loader.parse(filename, **options))
+    # Масштабирование параллельного разбора по числу процессов
+    for workers in worker_counts:
+        parallel = ParallelOBJLoader(workers=workers, min_parallel_bytes=0)
+        bench.measure(f"ParallelOBJLoader.load(workers={workers})", triangles,
+                      lambda parallel=parallel: parallel.load(filename))
+
+    transformer = AffineTransform()
+    copy = lambda: vertices.copy()
+    bench.measure("AffineTransform.translate", triangles, lambda v: transformer.translate(v, 1, 2, 3), copy)
+    bench.measure("AffineTransform.translate(out=)", triangles,
+                  lambda v: transformer.translate(v, 1, 2, 3, out=v), copy)
+    bench.measure("AffineTransform.rotate", triangles, lambda v: transformer.rotate(v, 10, 20, 30), copy)
+    bench.measure("AffineTransform.rotate(out=)", triangles,
+                  lambda v: transformer.rotate(v, 10, 20, 30, out=v), copy)
+    bench.measure("AffineTransform.scale", triangles, lambda v: transformer.scale(v, 2, 3, 4), copy)
+    bench.measure("AffineTransform.scale(out=)", triangles,
+                  lambda v: transformer.scale(v, 2, 3, 4, out=v), copy)
+    bench.measure("AffineTransform.scale_origin", triangles,
+                  lambda v: transformer.scale_origin(v, 2, 3, 4), copy)
+    matrices = transformer.compose_matrices(rotations=np.linspace(0, 90, 8 * 3).reshape(8, 3))
+    bench.measure("AffineTransform.apply_matrices(K=8)", triangles,
+                  lambda: transformer.apply_matrices(vertices, matrices))
+
+    bench.measure("MeshAnalysis (full pass)", triangles,
+                  lambda: MeshAnalysis(vertices, faces).summary_lines())
+
+    index = SpatialHash(vertices)
+    # Запросы рядом с поверхностью, как при привязке к вершинам
+    queries = vertices[::max(1, len(vertices) // 10000)] + 1e-3
+    bench.measure("SpatialHash.build", triangles, lambda: SpatialHash(vertices))
+    bench.measure("SpatialHash.query_knn(k=8, Q=1e4)", triangles, lambda: index.query_knn(queries, 8))
+    bench.measure("SpatialHash.find_duplicates", triangles, index.find_duplicates)
+
+    if triangles <= render_max:
+        # График окна просмотра без Tk: тот же draw_wireframe на фигуре Agg
+        renderer = OffscreenRenderer(size=(800, 600))
+        analysis = MeshAnalysis(vertices, faces)
+        def plot():
+            renderer.draw(vertices, faces, "3D Model Viewer", analysis)
+            renderer.canvas.draw()
+        bench.measure("draw_wireframe(Agg)", triangles, plot)
+
+def compare(results, baseline, tolerance):
+    """Return a list of (key, metric, baseline, current) regressions"""
+    regressions = []
+    for key, current in results.items():
+        previous = baseline.get(key)
+        if previous is None:
+            continue
+        for metric in ("seconds", "peak_bytes"):
+            old, new = previous.get(metric), current.get(metric)
+            if not old or new is None or new <= old * (1 + tolerance):
+                continue
+            if metric == "seconds" and new - old < NOISE_FLOOR_SECONDS:
+                continue
+            regressions.append((key, metric, old, new))
+    return regressions
+
+def environment():
+    return {
+        "python": sys.version.split()[0],
+        "numpy": np.__version__,
+        "matplotlib": matplotlib.__version__,
+        "platform": platform.platform(),
+        "processor": platform.processor(),
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark loaders, generators, transforms, writers and render")
+    parser.add_argument("--scales", default=DEFAULT_SCALES,
+                        help="Comma separated triangle counts, e.g. 1e3,1e5,1e7")
+    parser.add_argument("--render-max", type=float, default=DEFAULT_RENDER_MAX,
+                        help="Largest triangle count for the offscreen wireframe plot benchmark")
+    parser.add_argument("--workers", default="1,2,4",
+                        help="Comma separated process counts for the parallel loader")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per measurement (best is kept)")
+    parser.add_argument("--no-memory", action="store_true", help="Skip the tracemalloc peak memory run")
+    parser.add_argument("--baseline", help="Baseline JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="Allowed relative slowdown before a result is flagged")
+    parser.add_argument("--save-baseline", help="Write the results to this JSON file")
+    args = parser.parse_args(argv)
+
+    scales = [int(float(value)) for value in args.scales.split(",") if value.strip()]
+    worker_counts = [int(value) for value in args.workers.split(",") if value.strip()]
+    bench = Benchmark(repeat=args.repeat, measure_memory=not args.no_memory)
+
+    print(f"{'benchmark':40s} {'triangles':>10s} {'time':>15s} {'peak memory':>12s}")
+    with tempfile.TemporaryDirectory() as workdir:
+        for triangles in scales:
+            run_scale(bench, triangles, workdir, args.render_max, worker_counts)
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as file:
+            json.dump({"environment": environment(), "results": bench.results}, file, indent=2)
+        print(f"Baseline saved to {args.save_baseline}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as file:
+            baseline = json.load(file)["results"]
+        regressions = compare(bench.results, baseline, args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) over {args.tolerance:.0%} tolerance:")
+            for key, metric, old, new in regressions:
+                print(f"  {key} {metric}: {old:.6g} -> {new:.6g} ({new / old - 1:+.0%})")
+            return 1
+        print(f"\nNo regressions over {args.tolerance:.0%} tolerance")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,10 +1,12 @@
 import numpy as np
 import math
+from profiler import timed
 
 class FunctionSurface:
-    def __init__(self):
-        pass
+    def __init__(self, dtype=np.float64):
+        self.dtype = dtype
     
+    @timed("FunctionSurface.create_function_surface")
     def create_function_surface(self, function_str, x_range=(-3, 3), y_range=(-3, 3), subdivisions=20):
         """
         Create a surface from a function z = f(x, y)
@@ -51,7 +53,7 @@ class FunctionSurface:
                 faces.append([idx1, idx2, idx3])
                 faces.append([idx1, idx3, idx4])
         
-        return np.array(vertices), faces
+        return np.array(vertices, dtype=self.dtype), faces
     
     def create_paraboloid(self, subdivisions=20):
         """Create a paraboloid surface"""
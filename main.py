@@ -3,24 +3,72 @@ import matplotlib.pyplot as plt
 from mpl_toolkits.mplot3d import Axes3D
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
-from model_loader import OBJLoader
-from rotation_surface import RotationSurface
+from model_loader import OBJLoader, PLYLoader, STLLoader
+from parallel_loader import ParallelOBJLoader
+from rotation_surface import IncrementalRotationSurface
 from function_surface import FunctionSurface
 from affine_transformations import AffineTransform
 from obj_writer import OBJWriter
+from ply_writer import PLYWriter
+from stl_writer import STLWriter
+from transform_history import TransformHistory
+from mesh_edges import unique_edges
+from mesh_analysis import MeshAnalysis
+from wireframe_plot import draw_wireframe, set_axes_limits
+from profiler import profiler, timed
+from preview_scheduler import PreviewScheduler
 import os
 
+# Сцены с несколькими группами больше этого размера загружаются по группам,
+# а файлы из одного объекта разбираются параллельно
+LAZY_LOAD_BYTES = 20 * 1024 * 1024
+
+# Живой просмотр: частота кадров, пауза до полной отрисовки и размер прореженной модели
+PREVIEW_FPS = 20
+PREVIEW_SETTLE_MS = 300
+PREVIEW_MAX_EDGES = 5000
+PREVIEW_MAX_POINTS = 2000
+PREVIEW_SUBDIVISIONS = 40
+
+# Наибольший допуск объединения вершин относительно размера модели: при большем
+# допуске число пар близких вершин растет квадратично
+WELD_MAX_RELATIVE_TOLERANCE = 1e-3
+
 class ModelViewer3D:
-    def __init__(self, root):
+    """
+    Окно программы просмотра 3D моделей
+
+    dtype - тип вершин для всех загрузчиков, генераторов и преобразований
+    окна; np.float32 вдвое уменьшает память больших моделей ценой точности.
+    """
+
+    def __init__(self, root, dtype=np.float64):
         self.root = root
         self.root.title("3D Model Viewer - Программа для работы с 3D графикой")
         self.root.geometry("1200x800")
         
         self.current_vertices = None
         self.current_faces = None
+        self.analysis = None  # Кэш статистики модели: ребра, габариты, центр, площадь, объем
+        self.model_info_text = "Модель не загружена"
         self.current_model_type = None
         self.current_filename = None
-        self.original_vertices = None  # Сохраняем оригинальные вершины для сброса
+        self.vertex_dtype = dtype  # Тип вершин для загрузчика, генераторов и преобразований
+        self.scene_index = None  # Индекс объектов/групп/материалов загруженного OBJ
+        # Генератор фигуры вращения хранит таблицу cos/sin, грани и ребра между правками
+        self.rotation_generator = IncrementalRotationSurface(dtype)
+        self.rotation_params = None  # Параметры, по которым построена текущая фигура вращения
+        self.rotation_frame = None   # (параметры, предпросмотр) последнего кадра фигуры на экране
+        # Живой просмотр: события ползунков собираются в редкие кадры
+        self.preview = PreviewScheduler(root, self.render_preview, fps=PREVIEW_FPS,
+                                        settle_ms=PREVIEW_SETTLE_MS)
+        self.live_matrix = np.eye(4)  # Уже примененное к модели положение ползунков
+        self.live_center = None
+        self.preview_vertices = None
+        self._syncing_sliders = False
+        # История преобразований: матрицы шагов и редкие полные снимки вершин
+        self.history = TransformHistory(max_steps=100, checkpoint_interval=10,
+                                        max_bytes=64 * 1024 * 1024)
         
         self.setup_ui()
         
@@ -83,17 +131,53 @@ class ModelViewer3D:
         self.info_label = ttk.Label(info_frame, text="Модель не загружена", wraplength=280, justify=tk.LEFT)
         self.info_label.pack(fill=tk.X, pady=5, padx=5)
         
+        # Время последней операции по этапам
+        self.profile_label = ttk.Label(info_frame, text="Нет данных о времени", wraplength=280, justify=tk.LEFT)
+        self.profile_label.pack(fill=tk.X, pady=5, padx=5)
+        ttk.Button(info_frame, text="Сохранить трассировку (JSON)", 
+                  command=self.save_profile_trace).pack(fill=tk.X, pady=2, padx=5)
+        
         # Model loading section
         load_frame = ttk.LabelFrame(control_frame, text="Загрузка/Сохранение моделей")
         load_frame.pack(fill=tk.X, pady=5, padx=5)
         
-        ttk.Button(load_frame, text="Загрузить OBJ модель", 
+        ttk.Button(load_frame, text="Загрузить модель (OBJ/PLY/STL)", 
                   command=self.load_obj).pack(fill=tk.X, pady=2, padx=5)
-        ttk.Button(load_frame, text="Сохранить модель в OBJ", 
+        ttk.Button(load_frame, text="Сохранить модель (OBJ/PLY/STL)", 
                   command=self.save_obj).pack(fill=tk.X, pady=2, padx=5)
         ttk.Button(load_frame, text="Сбросить преобразования", 
                   command=self.reset_transformations).pack(fill=tk.X, pady=2, padx=5)
         
+        weld_frame = ttk.Frame(load_frame)
+        weld_frame.pack(fill=tk.X, pady=2, padx=5)
+        ttk.Label(weld_frame, text="Допуск:").pack(side=tk.LEFT)
+        self.weld_tolerance = ttk.Entry(weld_frame, width=8)
+        self.weld_tolerance.insert(0, "1e-6")
+        self.weld_tolerance.pack(side=tk.LEFT, padx=2)
+        ttk.Button(weld_frame, text="Объединить вершины", 
+                  command=self.weld_vertices).pack(side=tk.LEFT, fill=tk.X, expand=True)
+        
+        history_frame = ttk.Frame(load_frame)
+        history_frame.pack(fill=tk.X, pady=2, padx=5)
+        ttk.Button(history_frame, text="Отменить (Ctrl+Z)", 
+                  command=self.undo_transformation).pack(side=tk.LEFT, fill=tk.X, expand=True)
+        ttk.Button(history_frame, text="Повторить (Ctrl+Y)", 
+                  command=self.redo_transformation).pack(side=tk.LEFT, fill=tk.X, expand=True)
+        self.root.bind("<Control-z>", lambda e: self.undo_transformation())
+        self.root.bind("<Control-y>", lambda e: self.redo_transformation())
+        
+        # Scene groups section
+        scene_frame = ttk.LabelFrame(control_frame, text="Объекты сцены")
+        scene_frame.pack(fill=tk.X, pady=5, padx=5)
+        
+        self.scene_listbox = tk.Listbox(scene_frame, selectmode=tk.EXTENDED, height=6,
+                                        exportselection=False)
+        self.scene_listbox.pack(fill=tk.X, pady=2, padx=5)
+        ttk.Button(scene_frame, text="Показать выбранные", 
+                  command=self.show_selected_groups).pack(fill=tk.X, pady=2, padx=5)
+        ttk.Button(scene_frame, text="Показать все", 
+                  command=self.show_all_groups).pack(fill=tk.X, pady=2, padx=5)
+        
         # Rotation surface section
         rotation_frame = ttk.LabelFrame(control_frame, text="Фигура вращения")
         rotation_frame.pack(fill=tk.X, pady=5, padx=5)
@@ -102,19 +186,28 @@ class ModelViewer3D:
         self.profile_entry = ttk.Entry(rotation_frame, width=25)
         self.profile_entry.insert(0, "0,0 1,0 1,1 0,1")
         self.profile_entry.pack(fill=tk.X, pady=2, padx=5)
+        # Правка образующей сразу обновляет показанную фигуру вращения
+        self.profile_entry.bind("<KeyRelease>", lambda e: self.preview.request("rotation"))
         
         ttk.Label(rotation_frame, text="Ось вращения:").pack(anchor=tk.W, padx=5)
         self.axis_var = tk.StringVar(value="y")
         axis_frame = ttk.Frame(rotation_frame)
         axis_frame.pack(fill=tk.X, padx=5)
-        ttk.Radiobutton(axis_frame, text="X", variable=self.axis_var, value="x").pack(side=tk.LEFT)
-        ttk.Radiobutton(axis_frame, text="Y", variable=self.axis_var, value="y").pack(side=tk.LEFT)
-        ttk.Radiobutton(axis_frame, text="Z", variable=self.axis_var, value="z").pack(side=tk.LEFT)
+        for axis_name in ("x", "y", "z"):
+            ttk.Radiobutton(axis_frame, text=axis_name.upper(), variable=self.axis_var, value=axis_name,
+                            command=lambda: self.preview.request("rotation")).pack(side=tk.LEFT)
         
         ttk.Label(rotation_frame, text="Количество сегментов:").pack(anchor=tk.W, padx=5)
         self.segments_entry = ttk.Entry(rotation_frame, width=10)
         self.segments_entry.insert(0, "16")
         self.segments_entry.pack(fill=tk.X, pady=2, padx=5)
+        self.segments_entry.bind("<KeyRelease>", lambda e: self.preview.request("rotation"))
+        self.segments_slider = tk.Scale(rotation_frame, from_=3, to=256, orient=tk.HORIZONTAL,
+                                        showvalue=False,
+                                        command=lambda value: self.on_generator_slider(
+                                            self.segments_entry, value, "rotation"))
+        self.segments_slider.set(16)
+        self.segments_slider.pack(fill=tk.X, padx=5)
         
         ttk.Button(rotation_frame, text="Создать фигуру вращения", 
                   command=self.create_rotation_surface).pack(fill=tk.X, pady=5, padx=5)
@@ -142,6 +235,13 @@ class ModelViewer3D:
         self.subdivisions_entry = ttk.Entry(function_frame, width=10)
         self.subdivisions_entry.insert(0, "20")
         self.subdivisions_entry.pack(fill=tk.X, pady=2, padx=5)
+        self.subdivisions_entry.bind("<KeyRelease>", lambda e: self.preview.request("function"))
+        self.subdivisions_slider = tk.Scale(function_frame, from_=2, to=200, orient=tk.HORIZONTAL,
+                                            showvalue=False,
+                                            command=lambda value: self.on_generator_slider(
+                                                self.subdivisions_entry, value, "function"))
+        self.subdivisions_slider.set(20)
+        self.subdivisions_slider.pack(fill=tk.X, padx=5)
         
         ttk.Button(function_frame, text="Построить график функции", 
                   command=self.create_function_surface).pack(fill=tk.X, pady=5, padx=5)
@@ -198,6 +298,26 @@ class ModelViewer3D:
         ttk.Button(transform_frame, text="Применить масштаб", 
                   command=self.scale_model).pack(fill=tk.X, pady=2, padx=5)
         
+        # Live preview sliders
+        live_frame = ttk.LabelFrame(control_frame, text="Живой просмотр")
+        live_frame.pack(fill=tk.X, pady=5, padx=5)
+        
+        self.live_vars = {}
+        live_sliders = [
+            ("tx", "Перемещение X", -5.0, 5.0, 0.1, 0.0),
+            ("ty", "Перемещение Y", -5.0, 5.0, 0.1, 0.0),
+            ("tz", "Перемещение Z", -5.0, 5.0, 0.1, 0.0),
+            ("rx", "Поворот X", -180.0, 180.0, 1.0, 0.0),
+            ("ry", "Поворот Y", -180.0, 180.0, 1.0, 0.0),
+            ("rz", "Поворот Z", -180.0, 180.0, 1.0, 0.0),
+            ("scale", "Масштаб", 0.1, 3.0, 0.05, 1.0),
+        ]
+        for key, label, low, high, step, default in live_sliders:
+            variable = tk.DoubleVar(value=default)
+            self.live_vars[key] = (variable, default)
+            tk.Scale(live_frame, label=label, from_=low, to=high, resolution=step, orient=tk.HORIZONTAL,
+                     variable=variable, command=self.on_live_slider).pack(fill=tk.X, padx=5)
+        
         # Reset button
         ttk.Button(control_frame, text="Сбросить вид", 
                   command=self.reset_view).pack(fill=tk.X, pady=10, padx=5)
@@ -225,223 +345,527 @@ class ModelViewer3D:
     def load_obj(self):
         """Загрузка OBJ файла"""
         filename = filedialog.askopenfilename(
-            title="Выберите OBJ файл",
-            filetypes=[("OBJ files", "*.obj"), ("All files", "*.*")]
+            title="Выберите файл модели",
+            filetypes=[("3D models", "*.obj *.ply *.stl"), ("OBJ files", "*.obj"),
+                       ("PLY files", "*.ply"), ("STL files", "*.stl"), ("All files", "*.*")]
         )
         if filename:
             self.load_obj_file(filename)
     
     def load_obj_file(self, filename):
-        """Загрузка OBJ файла с расширенным парсером"""
+        """Загрузка OBJ файла с расширенным парсером (PLY и STL по расширению)"""
+        extension = os.path.splitext(filename)[1].lower()
+        if extension in (".ply", ".stl"):
+            self.load_binary_file(filename, extension)
+            return
         try:
-            loader = OBJLoader()
-            vertices, faces, texture_coords, normals = loader.load_obj_advanced(filename)
-            
-            self.current_vertices = vertices
-            self.original_vertices = vertices.copy()  # Сохраняем оригинал
-            self.current_faces = faces
-            self.current_model_type = "loaded"
-            self.current_filename = filename
-            
-            # Update info
-            info_text = f"Файл: {os.path.basename(filename)}\n"
-            info_text += f"Вершин: {len(vertices)}\n"
-            info_text += f"Граней: {len(faces)}\n"
-            if texture_coords:
-                info_text += f"Текстурных координат: {len(texture_coords)}\n"
-            if normals:
-                info_text += f"Нормалей: {len(normals)}"
+            with profiler.operation("load_obj_file"):
+                loader = OBJLoader(self.vertex_dtype)
+                large = os.path.getsize(filename) > LAZY_LOAD_BYTES
+                if large:
+                    # Индекс большого файла строят рабочие процессы, каждый по своей части
+                    index = ParallelOBJLoader(self.vertex_dtype).build_index(filename)
+                else:
+                    index = loader.build_index(filename)
+                
+                if len(index.groups) > 1:
+                    # Несколько объектов/материалов: большие сцены грузим по группам
+                    self.set_scene_index(index)
+                    self.load_scene_groups(index.groups[:1] if large else index.groups)
+                    vertices, faces = self.current_vertices, self.current_faces
+                else:
+                    self.set_scene_index(None)
+                    if large:
+                        # Большой файл из одного объекта разбираем на всех ядрах
+                        data = ParallelOBJLoader(self.vertex_dtype).load(filename)
+                        vertices, faces, texture_coords, normals = data.vertices, data.faces, (), ()
+                    else:
+                        vertices, faces, texture_coords, normals = loader.load_obj_advanced(filename)
+                    
+                    self.set_model(vertices, faces, "loaded", filename)
+                    
+                    # Update info
+                    info_text = f"Файл: {os.path.basename(filename)}\n"
+                    info_text += f"Вершин: {len(vertices)}\n"
+                    info_text += f"Граней: {len(faces)}\n"
+                    if len(texture_coords):
+                        info_text += f"Текстурных координат: {len(texture_coords)}\n"
+                    if len(normals):
+                        info_text += f"Нормалей: {len(normals)}"
+                    
+                    self.show_model_info(info_text)
+                    self.plot_model()
+            self.update_profile_info()
+            messagebox.showinfo("Успех", f"Модель загружена: {len(vertices)} вершин, {len(faces)} граней")
             
-            self.info_label.config(text=info_text)
-            self.plot_model()
+        except Exception as e:
+            messagebox.showerror("Ошибка", f"Не удалось загрузить модель: {str(e)}")
+    
+    def load_binary_file(self, filename, extension):
+        """Загрузка бинарного PLY или STL файла"""
+        try:
+            with profiler.operation("load_binary_file"):
+                if extension == ".ply":
+                    vertices, faces = PLYLoader(self.vertex_dtype).load_ply(filename)
+                else:
+                    vertices, faces = STLLoader(self.vertex_dtype).load_stl(filename)
+                self.set_scene_index(None)
+                self.set_model(vertices, faces, "loaded", filename)
+                
+                info_text = f"Файл: {os.path.basename(filename)}\n"
+                info_text += f"Вершин: {len(vertices)}\n"
+                info_text += f"Граней: {len(faces)}"
+                self.show_model_info(info_text)
+                self.plot_model()
+            self.update_profile_info()
             messagebox.showinfo("Успех", f"Модель загружена: {len(vertices)} вершин, {len(faces)} граней")
             
         except Exception as e:
             messagebox.showerror("Ошибка", f"Не удалось загрузить модель: {str(e)}")
     
+    def set_model(self, vertices, faces, model_type, filename=None, edges=None):
+        """Замена текущей модели и начало новой истории преобразований"""
+        self.current_vertices = vertices
+        self.history.reset(vertices)  # История хранит и исходные вершины для сброса
+        self.current_faces = faces
+        self.analysis = MeshAnalysis(vertices, faces, edges)
+        self.reset_live_transform()
+        self.current_model_type = model_type
+        self.current_filename = filename
+    
+    def set_scene_index(self, index):
+        """Заполнение списка объектов сцены"""
+        self.scene_index = index
+        self.scene_listbox.delete(0, tk.END)
+        if index is not None:
+            for group in index.groups:
+                self.scene_listbox.insert(tk.END, f"{group.label()} ({group.face_count})")
+    
+    def load_scene_groups(self, groups):
+        """Загрузка только выбранных групп из индексированного OBJ файла"""
+        loader = OBJLoader(self.vertex_dtype)
+        data = loader.load_groups(self.scene_index, groups)
+        self.set_model(data.vertices, data.faces, "loaded", self.scene_index.filename)
+        
+        self.scene_listbox.selection_clear(0, tk.END)
+        for group in groups:
+            self.scene_listbox.selection_set(self.scene_index.groups.index(group))
+        
+        info_text = f"Файл: {os.path.basename(self.scene_index.filename)}\n"
+        info_text += f"Групп: {len(groups)} из {len(self.scene_index.groups)}\n"
+        info_text += f"Вершин: {len(data.vertices)} из {self.scene_index.vertex_count}\n"
+        info_text += f"Граней: {len(data.faces)} из {self.scene_index.face_count}"
+        self.show_model_info(info_text)
+        self.plot_model()
+    
+    def show_selected_groups(self):
+        """Показ выбранных в списке групп"""
+        if self.scene_index is None:
+            messagebox.showwarning("Предупреждение", "Загруженная модель не содержит нескольких объектов")
+            return
+        selection = self.scene_listbox.curselection()
+        if not selection:
+            messagebox.showwarning("Предупреждение", "Выберите хотя бы один объект")
+            return
+        try:
+            with profiler.operation("load_scene_groups"):
+                self.load_scene_groups([self.scene_index.groups[i] for i in selection])
+            self.update_profile_info()
+        except Exception as e:
+            messagebox.showerror("Ошибка", f"Не удалось загрузить объекты: {str(e)}")
+    
+    def show_all_groups(self):
+        """Показ всех групп сцены"""
+        if self.scene_index is None:
+            messagebox.showwarning("Предупреждение", "Загруженная модель не содержит нескольких объектов")
+            return
+        try:
+            with profiler.operation("load_scene_groups"):
+                self.load_scene_groups(self.scene_index.groups)
+            self.update_profile_info()
+        except Exception as e:
+            messagebox.showerror("Ошибка", f"Не удалось загрузить объекты: {str(e)}")
+    
     def save_obj(self):
-        """Сохранение модели в OBJ файл"""
+        """Сохранение модели в OBJ, PLY или STL файл (по расширению)"""
         if self.current_vertices is None:
             messagebox.showwarning("Предупреждение", "Нет модели для сохранения")
             return
             
         filename = filedialog.asksaveasfilename(
-            title="Сохранить OBJ файл",
+            title="Сохранить модель",
             defaultextension=".obj",
-            filetypes=[("OBJ files", "*.obj"), ("All files", "*.*")]
+            filetypes=[("OBJ files", "*.obj"), ("PLY files (binary)", "*.ply"),
+                       ("STL files (binary)", "*.stl"), ("All files", "*.*")]
         )
         if filename:
             try:
-                writer = OBJWriter()
-                writer.write_obj(filename, self.current_vertices, self.current_faces)
+                with profiler.operation("save_obj"):
+                    extension = os.path.splitext(filename)[1].lower()
+                    if extension == ".ply":
+                        PLYWriter().write_ply(filename, self.current_vertices, self.current_faces)
+                    elif extension == ".stl":
+                        STLWriter().write_stl(filename, self.current_vertices, self.current_faces)
+                    else:
+                        OBJWriter().write_obj(filename, self.current_vertices, self.current_faces)
+                self.update_profile_info()
                 messagebox.showinfo("Успех", f"Модель сохранена в {filename}")
             except Exception as e:
                 messagebox.showerror("Ошибка", f"Не удалось сохранить модель: {str(e)}")
     
+    def show_model_info(self, text=None):
+        """Панель информации: описание модели и ее статистика из анализа"""
+        if text is not None:
+            self.model_info_text = text.rstrip("\n")
+        lines = [self.model_info_text]
+        if self.analysis is not None and len(self.current_vertices) > 0:
+            with profiler.section("show_model_info"):
+                lines.extend(self.analysis.summary_lines())
+        self.info_label.config(text="\n".join(lines))
+    
+    def update_profile_info(self, extra=None):
+        """Показ разбивки времени последней операции (extra - дополнительная строка)"""
+        text = profiler.breakdown_text()
+        if extra:
+            text += "\n" + extra
+        self.profile_label.config(text=text)
+    
+    def save_profile_trace(self):
+        """Сохранение трассировки профилировщика в JSON"""
+        filename = filedialog.asksaveasfilename(
+            title="Сохранить трассировку",
+            defaultextension=".json",
+            filetypes=[("JSON files", "*.json"), ("All files", "*.*")]
+        )
+        if filename:
+            try:
+                profiler.dump_json(filename)
+            except Exception as e:
+                messagebox.showerror("Ошибка", f"Не удалось сохранить трассировку: {str(e)}")
+    
     def reset_transformations(self):
         """Сброс всех преобразований к исходному состоянию"""
-        if self.original_vertices is not None:
-            self.current_vertices = self.original_vertices.copy()
-            self.plot_model()
+        if self.history.original is not None:
+            self.preview.cancel()
+            with profiler.operation("reset_transformations"):
+                self.current_vertices = self.history.original.copy()
+                self.analysis.set_vertices(self.current_vertices)
+                self.show_model_info()
+                self.reset_live_transform()
+                self.history.push("Сброс", None, self.current_vertices)
+                self.plot_model()
+            self.update_profile_info()
             messagebox.showinfo("Успех", "Все преобразования сброшены")
         else:
             messagebox.showwarning("Предупреждение", "Нет загруженной модели для сброса")
     
+    def weld_vertices(self):
+        """Объединение вершин, расположенных ближе допуска (новая история преобразований)"""
+        if self.current_vertices is None:
+            messagebox.showwarning("Предупреждение", "Нет загруженной модели")
+            return
+        try:
+            tolerance = float(self.weld_tolerance.get())
+            if tolerance < 0:
+                raise ValueError
+        except ValueError:
+            messagebox.showerror("Ошибка", "Неверное значение допуска")
+            return
+        low, high = self.analysis.bounds
+        max_tolerance = WELD_MAX_RELATIVE_TOLERANCE * float((high - low).max())
+        if tolerance > max_tolerance:
+            messagebox.showerror("Ошибка", f"Допуск слишком велик: не больше {max_tolerance:.3g} "
+                                           f"для этой модели")
+            return
+        
+        self.preview.flush()
+        with profiler.operation("weld_vertices"):
+            # Поиск дубликатов по пространственному индексу анализа модели
+            vertices, faces, _ = self.analysis.spatial_index.weld(
+                self.current_vertices, self.current_faces, tolerance)
+            merged = len(self.current_vertices) - len(vertices)
+            info_text = self.model_info_text
+            self.set_model(vertices, faces, self.current_model_type, self.current_filename)
+            self.show_model_info(f"{info_text}\nПосле объединения: {len(vertices)} вершин, "
+                                 f"{len(faces)} граней")
+            self.plot_model()
+        self.update_profile_info()
+        messagebox.showinfo("Успех", f"Объединено вершин: {merged}")
+    
+    def undo_transformation(self):
+        """Отмена последнего преобразования"""
+        self.preview.flush()  # Незавершенный живой просмотр сначала попадает в историю
+        if not self.history.can_undo():
+            return
+        with profiler.operation("undo_transformation"):
+            self.current_vertices = self.history.undo()
+            self.analysis.set_vertices(self.current_vertices)
+            self.show_model_info()
+            self.reset_live_transform()
+            self.plot_model()
+        self.update_profile_info()
+    
+    def redo_transformation(self):
+        """Повтор отмененного преобразования"""
+        self.preview.flush()
+        if not self.history.can_redo():
+            return
+        with profiler.operation("redo_transformation"):
+            self.current_vertices = self.history.redo()
+            self.analysis.set_vertices(self.current_vertices)
+            self.show_model_info()
+            self.reset_live_transform()
+            self.plot_model()
+        self.update_profile_info()
+    
+    def read_rotation_params(self):
+        """Чтение образующей, оси и числа сегментов из полей ввода"""
+        profile_text = self.profile_entry.get()
+        axis = self.axis_var.get()
+        segments = int(self.segments_entry.get())
+        
+        # Parse profile points
+        points = []
+        for point_str in profile_text.split():
+            x, y = map(float, point_str.split(','))
+            points.append((x, y))
+        return points, axis, segments
+    
+    def show_rotation_surface(self, points, axis, segments):
+        """
+        Обновление фигуры вращения: пересчитываются только измененные точки образующей
+
+        Если модель - сетка генератора с прежней топологией, ее вершины
+        переписываются на месте, кэш ребер анализа сохраняется, а правка
+        попадает в историю одним абсолютным шагом вместо сброса истории.
+        """
+        params = (tuple(points), axis, segments)
+        vertices, faces, _ = self.rotation_generator.update(points, axis, segments)
+        
+        # Модель должна быть сеткой генератора: объединение вершин заменяет грани и вершины
+        same_topology = (self.current_model_type == "rotation" and self.current_faces is faces
+                         and len(self.current_vertices) == len(vertices))
+        if same_topology:
+            # Генератор обновляет свои массивы на месте, поэтому вершины модели - отдельный массив
+            np.copyto(self.current_vertices, vertices)
+            self.analysis.set_vertices(self.current_vertices)
+            self.history.push("Фигура вращения", None, self.current_vertices)
+            self.reset_live_transform()
+        else:
+            self.set_model(vertices.copy(), faces, "rotation", edges=self.rotation_generator.edges)
+            self.set_scene_index(None)
+        self.rotation_params = params
+        self.rotation_frame = (params, False)
+        
+        self.show_model_info(f"Фигура вращения\nВершин: {len(vertices)}\nГраней: {len(faces)}")
+        self.plot_model()
+    
+    def preview_rotation(self, preview):
+        """Кадр живого просмотра фигуры вращения после правки параметров"""
+        if self.current_model_type != "rotation":
+            return
+        try:
+            points, axis, segments = self.read_rotation_params()
+        except ValueError:
+            return  # Ввод еще не закончен
+        if len(points) < 2 or segments < 1:
+            return
+        
+        # Клавиши без правки (стрелки, Tab, Shift) не меняют параметры и не перерисовывают кадр
+        params = (tuple(points), axis, segments)
+        if preview:
+            if self.rotation_frame is not None and self.rotation_frame[0] == params:
+                return
+            vertices, _, _ = self.rotation_generator.update(points, axis, segments)
+            self.plot_model(vertices, self.rotation_generator.edges, preview=True)
+            self.rotation_frame = (params, True)
+        elif params != self.rotation_params:
+            self.show_rotation_surface(points, axis, segments)
+        elif self.rotation_frame != (params, False):
+            # Параметры вернулись к модели после кадров предпросмотра
+            self.plot_model()
+            self.rotation_frame = (params, False)
+    
     def create_rotation_surface(self):
         """Создание фигуры вращения"""
         try:
-            profile_text = self.profile_entry.get()
-            axis = self.axis_var.get()
-            segments = int(self.segments_entry.get())
-            
-            # Parse profile points
-            points = []
-            for point_str in profile_text.split():
-                x, y = map(float, point_str.split(','))
-                points.append((x, y))
+            points, axis, segments = self.read_rotation_params()
             
             if len(points) < 2:
                 messagebox.showerror("Ошибка", "Необходимо указать как минимум 2 точки образующей")
                 return
             
-            rotation_surface = RotationSurface()
-            vertices, faces = rotation_surface.create_rotation_surface(points, axis, segments)
-            
-            self.current_vertices = vertices
-            self.original_vertices = vertices.copy()  # Сохраняем оригинал
-            self.current_faces = faces
-            self.current_model_type = "rotation"
-            self.current_filename = None
-            
-            self.info_label.config(text=f"Фигура вращения\nВершин: {len(vertices)}\nГраней: {len(faces)}")
-            self.plot_model()
+            with profiler.operation("create_rotation_surface"):
+                self.show_rotation_surface(points, axis, segments)
+            self.update_profile_info()
             
             messagebox.showinfo("Успех", 
-                              f"Фигура вращения создана: {len(vertices)} вершин, {len(faces)} граней")
+                              f"Фигура вращения создана: {len(self.current_vertices)} вершин, "
+                              f"{len(self.current_faces)} граней")
                               
         except Exception as e:
             messagebox.showerror("Ошибка", f"Не удалось создать фигуру вращения: {str(e)}")
     
+    def read_function_params(self):
+        """Чтение функции, диапазонов и числа разбиений из полей ввода"""
+        function_text = self.function_entry.get()
+        x_range = tuple(map(float, self.x_range_entry.get().split(',')))
+        y_range = tuple(map(float, self.y_range_entry.get().split(',')))
+        subdivisions = int(self.subdivisions_entry.get())
+        return function_text, x_range, y_range, subdivisions
+    
+    def show_function_surface(self, function_text, x_range, y_range, subdivisions):
+        """Построение и отрисовка графика функции"""
+        function_surface = FunctionSurface(self.vertex_dtype)
+        vertices, faces = function_surface.create_function_surface(
+            function_text, x_range, y_range, subdivisions
+        )
+        
+        self.set_model(vertices, faces, "function")
+        self.set_scene_index(None)
+        
+        self.show_model_info(f"График функции\nВершин: {len(vertices)}\nГраней: {len(faces)}")
+        self.plot_model()
+    
+    def preview_function(self, preview):
+        """Кадр живого просмотра графика функции; предпросмотр строится на грубой сетке"""
+        if self.current_model_type != "function":
+            return
+        try:
+            function_text, x_range, y_range, subdivisions = self.read_function_params()
+        except ValueError:
+            return  # Ввод еще не закончен
+        if len(x_range) != 2 or len(y_range) != 2 or subdivisions < 2:
+            return
+        
+        if preview:
+            coarse = min(subdivisions, PREVIEW_SUBDIVISIONS)
+            vertices, faces = FunctionSurface(self.vertex_dtype).create_function_surface(
+                function_text, x_range, y_range, coarse
+            )
+            self.plot_model(vertices, unique_edges(faces, len(vertices)), preview=True)
+        else:
+            self.show_function_surface(function_text, x_range, y_range, subdivisions)
+    
     def create_function_surface(self):
         """Построение графика функции"""
         try:
-            function_text = self.function_entry.get()
-            x_range = tuple(map(float, self.x_range_entry.get().split(',')))
-            y_range = tuple(map(float, self.y_range_entry.get().split(',')))
-            subdivisions = int(self.subdivisions_entry.get())
+            function_text, x_range, y_range, subdivisions = self.read_function_params()
             
             if len(x_range) != 2 or len(y_range) != 2:
                 messagebox.showerror("Ошибка", "Диапазоны должны быть указаны как два числа через запятую")
                 return
             
-            function_surface = FunctionSurface()
-            vertices, faces = function_surface.create_function_surface(
-                function_text, x_range, y_range, subdivisions
-            )
-            
-            self.current_vertices = vertices
-            self.original_vertices = vertices.copy()  # Сохраняем оригинал
-            self.current_faces = faces
-            self.current_model_type = "function"
-            self.current_filename = None
-            
-            self.info_label.config(text=f"График функции\nВершин: {len(vertices)}\nГраней: {len(faces)}")
-            self.plot_model()
+            with profiler.operation("create_function_surface"):
+                self.show_function_surface(function_text, x_range, y_range, subdivisions)
+            self.update_profile_info()
             
             messagebox.showinfo("Успех", 
-                              f"График функции создан: {len(vertices)} вершин, {len(faces)} граней")
+                              f"График функции создан: {len(self.current_vertices)} вершин, "
+                              f"{len(self.current_faces)} граней")
                               
         except Exception as e:
             messagebox.showerror("Ошибка", f"Не удалось построить график функции: {str(e)}")
     
-    def plot_model(self):
-        """Отрисовка 3D модели в каркасном режиме"""
-        self.ax.clear()
-        
-        if self.current_vertices is not None and self.current_faces is not None:
-            vertices = np.array(self.current_vertices)
-            faces = self.current_faces
-            
-            # Для каждого ребра рисуем линию
-            edges_set = set()  # Чтобы избежать дублирования ребер
-            
-            for face in faces:
-                if len(face) >= 3:
-                    # Добавляем все ребра грани
-                    for i in range(len(face)):
-                        v1 = face[i]
-                        v2 = face[(i + 1) % len(face)]
-                        
-                        # Сортируем индексы для уникальности ребра
-                        edge = tuple(sorted([v1, v2]))
-                        if edge not in edges_set:
-                            edges_set.add(edge)
-                            
-                            # Проверяем что индексы в пределах массива вершин
-                            if v1 < len(vertices) and v2 < len(vertices):
-                                # Рисуем ребро
-                                self.ax.plot(
-                                    [vertices[v1][0], vertices[v2][0]],
-                                    [vertices[v1][1], vertices[v2][1]],
-                                    [vertices[v1][2], vertices[v2][2]],
-                                    color='blue',
-                                    linewidth=1.0,
-                                    alpha=0.8
-                                )
-            
-            # Опционально: рисуем вершины точками
-            self.ax.scatter(
-                vertices[:, 0],
-                vertices[:, 1],
-                vertices[:, 2],
-                color='red',
-                s=15,
-                alpha=0.6,
-                marker='o'
-            )
+    def on_generator_slider(self, entry, value, key):
+        """Ползунок сегментов/разбиений: значение переносится в поле ввода"""
+        entry.delete(0, tk.END)
+        entry.insert(0, str(int(float(value))))
+        self.preview.request(key)
+    
+    def on_live_slider(self, value=None):
+        """Ползунок живого преобразования"""
+        if not self._syncing_sliders:
+            self.preview.request("transform")
+    
+    def live_transform_matrix(self):
+        """Матрица 4x4 текущего положения ползунков (поворот и масштаб вокруг центра модели)"""
+        values = {key: variable.get() for key, (variable, _) in self.live_vars.items()}
+        if self.live_center is None:
+            self.live_center = self.analysis.centroid
+        center = self.live_center
+        
+        transformer = AffineTransform(self.vertex_dtype)
+        factor = values["scale"]
+        return (transformer.translation_matrix(values["tx"] + center[0], values["ty"] + center[1],
+                                               values["tz"] + center[2])
+                @ transformer.rotation_matrix4(values["rx"], values["ry"], values["rz"])
+                @ transformer.scale_matrix(factor, factor, factor)
+                @ transformer.translation_matrix(-center[0], -center[1], -center[2]))
+    
+    def reset_live_transform(self):
+        """Ползунки живого преобразования в начальное положение (модель не меняется)"""
+        self.live_matrix = np.eye(4)
+        self.live_center = None
+        self.preview_vertices = None
+        if not hasattr(self, "live_vars"):
+            return
+        self._syncing_sliders = True
+        try:
+            for variable, default in self.live_vars.values():
+                variable.set(default)
+        finally:
+            self._syncing_sliders = False
+    
+    def preview_transform(self, preview):
+        """Кадр живого преобразования: предпросмотр не меняет модель, полный кадр применяет его"""
+        if self.current_vertices is None or len(self.current_vertices) == 0:
+            return
+        matrix = self.live_transform_matrix()
+        # Модель уже содержит live_matrix, применяется только разница
+        delta = matrix @ np.linalg.inv(self.live_matrix)
+        transformer = AffineTransform(self.vertex_dtype)
+        
+        if preview:
+            if self.preview_vertices is None or self.preview_vertices.shape != self.current_vertices.shape:
+                self.preview_vertices = np.empty_like(self.current_vertices)
+            transformer.apply_matrix(self.current_vertices, delta, out=self.preview_vertices)
+            self.plot_model(self.preview_vertices, self.analysis.edges, preview=True,
+                            bounds=self.analysis.transformed_bounds(delta))
+        elif np.allclose(delta, np.eye(4)):
+            # Ползунки вернулись в исходное положение: в истории нечего записывать
+            self.plot_model()
+        else:
+            transformer.apply_matrix(self.current_vertices, delta, out=self.current_vertices,
+                                     analysis=self.analysis)
+            self.history.push("Живой просмотр", delta, self.current_vertices)
+            self.live_matrix = matrix
+            self.show_model_info()
+            self.plot_model()
+    
+    def render_preview(self, keys, preview):
+        """Отрисовка кадра планировщика живого просмотра"""
+        try:
+            with profiler.operation("live_preview" if preview else "live_preview_final"):
+                if "rotation" in keys:
+                    self.preview_rotation(preview)
+                if "function" in keys:
+                    self.preview_function(preview)
+                if "transform" in keys:
+                    self.preview_transform(preview)
+        except Exception as e:
+            if not preview:
+                messagebox.showerror("Ошибка", f"Не удалось обновить модель: {str(e)}")
+            return
+        if not preview:
+            self.update_profile_info(self.preview.summary_text())
+    
+    @timed("ModelViewer3D.plot_model")
+    def plot_model(self, vertices=None, edges=None, preview=False, bounds=None):
+        """
+        Отрисовка 3D модели в каркасном режиме
+        
+        vertices и edges задают кадр живого просмотра вместо текущей модели
+        (bounds - его габариты, если известны); при preview=True ребра и точки
+        прореживаются до PREVIEW_MAX_EDGES/PREVIEW_MAX_POINTS.
+        """
+        if vertices is None and self.current_vertices is not None and self.current_faces is not None:
+            vertices = np.asarray(self.current_vertices)
             
-            # Calculate bounds for auto-scaling
-            if len(vertices) > 0:
-                min_coords = vertices.min(axis=0)
-                max_coords = vertices.max(axis=0)
-                center = (min_coords + max_coords) / 2
-                max_range = (max_coords - min_coords).max() / 2
-                
-                # Set limits with some padding
-                padding = max_range * 0.1
-                self.ax.set_xlim(center[0] - max_range - padding, center[0] + max_range + padding)
-                self.ax.set_ylim(center[1] - max_range - padding, center[1] + max_range + padding)
-                self.ax.set_zlim(center[2] - max_range - padding, center[2] + max_range + padding)
-        
-        self.ax.set_xlabel('X')
-        self.ax.set_ylabel('Y')
-        self.ax.set_zlabel('Z')
-        
-        title = '3D Model Viewer - Wireframe'
-        if self.current_filename:
-            title += f' - {os.path.basename(self.current_filename)}'
-        elif self.current_model_type == "rotation":
-            title += ' - Фигура вращения'
-        elif self.current_model_type == "function":
-            title += ' - График функции'
-        elif self.current_model_type == "loaded":
-            title += ' - Загруженная модель'
-        
-        self.ax.set_title(title)
-        
-        # Устанавливаем прозрачный фон
-        self.ax.xaxis.set_pane_color((1.0, 1.0, 1.0, 0.0))
-        self.ax.yaxis.set_pane_color((1.0, 1.0, 1.0, 0.0))
-        self.ax.zaxis.set_pane_color((1.0, 1.0, 1.0, 0.0))
-        
-        # Сетка для лучшей ориентации
-        self.ax.grid(True, linestyle=':', alpha=0.2)
-        
-        self.canvas_plot.draw()
-        
-        self.ax.set_xlabel('X')
-        self.ax.set_ylabel('Y')
-        self.ax.set_zlabel('Z')
+            with profiler.section("plot_model.edges"):
+                # Ребра и габариты берутся из кэша анализа модели
+                edges = self.analysis.edges
+                bounds = self.analysis.bounds
         
         title = '3D Model Viewer'
         if self.current_filename:
@@ -453,8 +877,12 @@ class ModelViewer3D:
         elif self.current_model_type == "loaded":
             title += ' - Загруженная модель'
         
-        self.ax.set_title(title)
-        self.canvas_plot.draw()
+        draw_wireframe(self.ax, vertices, edges, title, bounds,
+                       max_edges=PREVIEW_MAX_EDGES if preview else None,
+                       max_points=PREVIEW_MAX_POINTS if preview else None)
+        
+        with profiler.section("plot_model.draw"):
+            self.canvas_plot.draw()
     
     def translate_model(self):
         """Применение перемещения к модели"""
@@ -467,9 +895,19 @@ class ModelViewer3D:
             dy = float(self.trans_y.get())
             dz = float(self.trans_z.get())
             
-            transformer = AffineTransform()
-            self.current_vertices = transformer.translate(self.current_vertices, dx, dy, dz)
-            self.plot_model()
+            # Незавершенный живой просмотр попадает в историю до этого шага
+            self.preview.flush()
+            with profiler.operation("translate_model"):
+                transformer = AffineTransform(self.vertex_dtype)
+                # Преобразование на месте, без копии массива вершин
+                transformer.translate(self.current_vertices, dx, dy, dz, out=self.current_vertices,
+                                      analysis=self.analysis)
+                self.history.push("Перемещение", transformer.translation_matrix(dx, dy, dz),
+                                  self.current_vertices)
+                self.reset_live_transform()  # Ползунки отсчитываются от новой модели
+                self.show_model_info()
+                self.plot_model()
+            self.update_profile_info()
             
         except ValueError:
             messagebox.showerror("Ошибка", "Неверные значения перемещения")
@@ -485,9 +923,19 @@ class ModelViewer3D:
             ry = float(self.rot_y.get())
             rz = float(self.rot_z.get())
             
-            transformer = AffineTransform()
-            self.current_vertices = transformer.rotate(self.current_vertices, rx, ry, rz)
-            self.plot_model()
+            # Незавершенный живой просмотр попадает в историю до этого шага
+            self.preview.flush()
+            with profiler.operation("rotate_model"):
+                transformer = AffineTransform(self.vertex_dtype)
+                # Преобразование на месте, без копии массива вершин
+                transformer.rotate(self.current_vertices, rx, ry, rz, out=self.current_vertices,
+                                   analysis=self.analysis)
+                self.history.push("Поворот", transformer.rotation_matrix4(rx, ry, rz),
+                                  self.current_vertices)
+                self.reset_live_transform()  # Ползунки отсчитываются от новой модели
+                self.show_model_info()
+                self.plot_model()
+            self.update_profile_info()
             
         except ValueError:
             messagebox.showerror("Ошибка", "Неверные значения поворота")
@@ -503,9 +951,20 @@ class ModelViewer3D:
             sy = float(self.scale_y.get())
             sz = float(self.scale_z.get())
             
-            transformer = AffineTransform()
-            self.current_vertices = transformer.scale(self.current_vertices, sx, sy, sz)
-            self.plot_model()
+            # Незавершенный живой просмотр попадает в историю до этого шага
+            self.preview.flush()
+            with profiler.operation("scale_model"):
+                transformer = AffineTransform(self.vertex_dtype)
+                center = self.analysis.centroid
+                # Преобразование на месте, без копии массива вершин
+                transformer.scale(self.current_vertices, sx, sy, sz, out=self.current_vertices,
+                                  center=center, analysis=self.analysis)
+                self.history.push("Масштаб", transformer.scale_matrix(sx, sy, sz, center),
+                                  self.current_vertices)
+                self.reset_live_transform()  # Ползунки отсчитываются от новой модели
+                self.show_model_info()
+                self.plot_model()
+            self.update_profile_info()
             
         except ValueError:
             messagebox.showerror("Ошибка", "Неверные значения масштаба")
@@ -513,16 +972,7 @@ class ModelViewer3D:
     def reset_view(self):
         """Сброс вида камеры"""
         if self.current_vertices is not None and len(self.current_vertices) > 0:
-            vertices = np.array(self.current_vertices)
-            min_coords = vertices.min(axis=0)
-            max_coords = vertices.max(axis=0)
-            center = (min_coords + max_coords) / 2
-            max_range = (max_coords - min_coords).max() / 2
-            
-            padding = max_range * 0.1
-            self.ax.set_xlim(center[0] - max_range - padding, center[0] + max_range + padding)
-            self.ax.set_ylim(center[1] - max_range - padding, center[1] + max_range + padding)
-            self.ax.set_zlim(center[2] - max_range - padding, center[2] + max_range + padding)
+            set_axes_limits(self.ax, self.analysis.bounds)
         else:
             self.ax.set_xlim(-2, 2)
             self.ax.set_ylim(-2, 2)
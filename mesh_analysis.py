@@ -0,0 +1,292 @@
+import numpy as np
+from profiler import timed
+from mesh_edges import edge_face_counts, triangulate_faces
+
+EDGE_HISTOGRAM_BINS = 16
+
+# Символы текстовой гистограммы длин ребер для панели информации
+_HISTOGRAM_LEVELS = "▁▂▃▄▅▆▇█"
+
+class MeshAnalysis:
+    """
+    Cached statistics of one mesh, shared by the viewer, the transforms and
+    the info panel
+
+    Topology (edges, faces per edge, triangulation) is computed once per
+    face list. Geometry (bounds, centroid, surface area, signed volume,
+    edge lengths) is computed in one vectorized pass over the vertices and
+    triangles on first use. After an affine transform the cache is updated
+    analytically instead of recomputed: the centroid and the signed volume
+    always, the bounds for axis-aligned linear parts (translate, scale),
+    area, edge lengths and the spatial index for similarity transforms
+    (rotation, uniform scale). Values that cannot be updated exactly are
+    recomputed on the next access.
+    """
+
+    def __init__(self, vertices, faces, edges=None, bins=EDGE_HISTOGRAM_BINS):
+        """
+        Args:
+            vertices: Array (N, 3); kept by reference, not copied
+            faces: Array (M, K) or list of face indices
+            edges: Unique edges (E, 2) if already known (e.g. from a generator)
+            bins: Number of bins of the edge length histogram
+        """
+        self.vertices = vertices
+        self.faces = faces
+        self.bins = bins
+        self._edges = edges
+        self._edge_faces = None
+        self._triangles = None
+        self._spatial_index = None
+        self._clear_geometry()
+
+    def _clear_geometry(self):
+        self._bounds = None
+        self._centroid = None
+        self._area = None
+        self._volume = None
+        self._histogram = None      # (counts, bin_edges)
+        self._lengths = None        # (min, mean, max)
+
+    def set_vertices(self, vertices):
+        """New vertex positions with the same topology (undo, redo, reset)"""
+        self.vertices = vertices
+        self._spatial_index = None
+        self._clear_geometry()
+
+    # ------------------------------------------------------------------
+    # Topology
+    # ------------------------------------------------------------------
+
+    @property
+    def edges(self):
+        """Unique edges (E, 2)"""
+        if self._edges is None:
+            self._topology()
+        return self._edges
+
+    @property
+    def triangles(self):
+        """Faces fan-triangulated into an (M, 3) array"""
+        if self._triangles is None:
+            self._triangles = triangulate_faces(self.faces).astype(np.int64, copy=False)
+            if len(self._triangles):
+                valid = (self._triangles < len(self.vertices)).all(axis=1)
+                self._triangles = self._triangles[valid]
+        return self._triangles
+
+    def _topology(self):
+        edges, self._edge_faces = edge_face_counts(self.faces, len(self.vertices))
+        if self._edges is None:
+            self._edges = edges
+
+    @property
+    def manifold(self):
+        """Edge manifoldness: boundary and non-manifold edge counts"""
+        if self._edge_faces is None:
+            self._topology()
+        boundary = int(np.count_nonzero(self._edge_faces == 1))
+        non_manifold = int(np.count_nonzero(self._edge_faces > 2))
+        return {
+            "boundary_edges": boundary,
+            "non_manifold_edges": non_manifold,
+            "is_manifold": non_manifold == 0,
+            "is_closed": boundary == 0 and non_manifold == 0 and len(self._edge_faces) > 0,
+        }
+
+    # ------------------------------------------------------------------
+    # Geometry
+    # ------------------------------------------------------------------
+
+    @property
+    def bounds(self):
+        """(min, max) corners of the axis-aligned bounding box"""
+        if self._bounds is None:
+            vertices = np.asarray(self.vertices)
+            if len(vertices) == 0:
+                self._bounds = (np.zeros(3), np.zeros(3))
+            else:
+                self._bounds = (vertices.min(axis=0).astype(np.float64),
+                                vertices.max(axis=0).astype(np.float64))
+        return self._bounds
+
+    @property
+    def centroid(self):
+        """Mean of the vertices"""
+        if self._centroid is None:
+            vertices = np.asarray(self.vertices)
+            self._centroid = vertices.mean(axis=0, dtype=np.float64) if len(vertices) else np.zeros(3)
+        return self._centroid
+
+    @property
+    def spatial_index(self):
+        """SpatialHash of the vertices for nearest-vertex and duplicate queries"""
+        if self._spatial_index is None:
+            from spatial_hash import SpatialHash
+            self._spatial_index = SpatialHash(self.vertices)
+        return self._spatial_index
+
+    @property
+    def surface_area(self):
+        if self._area is None:
+            self._analyze()
+        return self._area
+
+    @property
+    def signed_volume(self):
+        """Volume enclosed by the triangles (meaningful for closed meshes; sign follows the winding)"""
+        if self._volume is None:
+            self._analyze()
+        return self._volume
+
+    @property
+    def edge_length_histogram(self):
+        """(counts, bin_edges) of the edge lengths"""
+        if self._histogram is None:
+            self._analyze()
+        return self._histogram
+
+    @property
+    def edge_lengths(self):
+        """(min, mean, max) edge length"""
+        if self._lengths is None:
+            self._analyze()
+        return self._lengths
+
+    @timed("MeshAnalysis.analyze")
+    def _analyze(self):
+        """One pass over vertices, triangles and edges filling every geometric statistic"""
+        vertices = np.asarray(self.vertices, dtype=np.float64)
+        if len(vertices):
+            self._bounds = (vertices.min(axis=0), vertices.max(axis=0))
+            self._centroid = vertices.mean(axis=0)
+        else:
+            self._bounds = (np.zeros(3), np.zeros(3))
+            self._centroid = np.zeros(3)
+
+        triangles = self.triangles
+        if len(triangles):
+            first = vertices[triangles[:, 0]]
+            normals = np.cross(vertices[triangles[:, 1]] - first, vertices[triangles[:, 2]] - first)
+            self._area = 0.5 * float(np.linalg.norm(normals, axis=1).sum())
+            # Сумма смешанных произведений a . ((b - a) x (c - a)) = a . (b x c)
+            self._volume = float(np.einsum('ij,ij->', first, normals)) / 6.0
+        else:
+            self._area = 0.0
+            self._volume = 0.0
+
+        edges = self.edges
+        if len(edges):
+            lengths = np.linalg.norm(vertices[edges[:, 1]] - vertices[edges[:, 0]], axis=1)
+            self._histogram = np.histogram(lengths, bins=self.bins)
+            self._lengths = (float(lengths.min()), float(lengths.mean()), float(lengths.max()))
+        else:
+            self._histogram = (np.zeros(self.bins, dtype=np.int64), np.zeros(self.bins + 1))
+            self._lengths = (0.0, 0.0, 0.0)
+
+    # ------------------------------------------------------------------
+    # Affine updates
+    # ------------------------------------------------------------------
+
+    def transform(self, matrix, vertices=None):
+        """
+        Update the cache after the vertices were transformed by a 4x4 matrix
+
+        Args:
+            matrix: Homogeneous 4x4 matrix that was applied
+            vertices: The transformed array if it is not the analysed one (not in place)
+        """
+        if vertices is not None:
+            self.vertices = vertices
+        matrix = np.asarray(matrix, dtype=np.float64)
+        linear = matrix[:3, :3]
+        offset = matrix[:3, 3]
+
+        if self._centroid is not None:
+            self._centroid = linear @ self._centroid + offset
+        if self._volume is not None:
+            self._volume *= float(np.linalg.det(linear))
+
+        if self._bounds is not None:
+            if _is_axis_aligned(linear):
+                self._bounds = self._transform_box(matrix)
+            else:
+                self._bounds = None
+
+        scale = similarity_scale(linear)
+        if self._spatial_index is not None:
+            # Индекс следует за жесткими преобразованиями без перестроения
+            if scale is None:
+                self._spatial_index = None
+            else:
+                self._spatial_index.transform(matrix)
+        if scale is None:
+            self._area = None
+            self._histogram = None
+            self._lengths = None
+        else:
+            if self._area is not None:
+                self._area *= scale * scale
+            if self._histogram is not None:
+                self._histogram = (self._histogram[0], self._histogram[1] * scale)
+            if self._lengths is not None:
+                self._lengths = tuple(value * scale for value in self._lengths)
+
+    def transformed_bounds(self, matrix):
+        """
+        Bounding box of the mesh transformed by matrix, without touching the vertices
+
+        Exact for axis-aligned linear parts, otherwise the box around the
+        transformed corners of the current box (never smaller than the mesh).
+        """
+        return self._transform_box(np.asarray(matrix, dtype=np.float64))
+
+    def _transform_box(self, matrix):
+        low, high = self.bounds
+        corners = np.array(np.meshgrid(*zip(low, high), indexing='ij')).reshape(3, -1).T
+        corners = corners @ matrix[:3, :3].T + matrix[:3, 3]
+        return corners.min(axis=0), corners.max(axis=0)
+
+    # ------------------------------------------------------------------
+    # Info panel
+    # ------------------------------------------------------------------
+
+    def summary_lines(self):
+        """Lines for the model info panel"""
+        low, high = self.bounds
+        size = high - low
+        center = self.centroid
+        shortest, mean, longest = self.edge_lengths
+        counts = self.edge_length_histogram[0]
+        manifold = self.manifold
+
+        lines = [
+            f"Размер: {size[0]:.3g} x {size[1]:.3g} x {size[2]:.3g}",
+            f"Центр: ({center[0]:.3g}, {center[1]:.3g}, {center[2]:.3g})",
+            f"Площадь поверхности: {self.surface_area:.4g}",
+            f"Объем (со знаком): {self.signed_volume:.4g}",
+            f"Ребер: {len(self.edges)}, длина {shortest:.3g}..{longest:.3g} (средняя {mean:.3g})",
+        ]
+        if counts.max() > 0:
+            levels = np.ceil(counts / counts.max() * (len(_HISTOGRAM_LEVELS) - 1)).astype(int)
+            lines.append("Длины ребер: " + "".join(_HISTOGRAM_LEVELS[level] for level in levels))
+        if manifold["is_closed"]:
+            lines.append("Замкнутое многообразие")
+        else:
+            lines.append(f"Граничных ребер: {manifold['boundary_edges']}, "
+                         f"немногообразных: {manifold['non_manifold_edges']}")
+        return lines
+
+def _is_axis_aligned(linear):
+    """Each output axis depends on one input axis (translation, scale, axis permutation)"""
+    magnitude = np.abs(linear)
+    significant = magnitude > 1e-12 * max(float(magnitude.max()), 1e-300)
+    return significant.sum(axis=1).max() <= 1 and significant.sum(axis=0).max() <= 1
+
+def similarity_scale(linear):
+    """Uniform scale factor s if linear = s * orthogonal, otherwise None"""
+    gram = linear.T @ linear
+    squared = float(np.trace(gram)) / 3.0
+    if squared <= 0 or not np.allclose(gram, squared * np.eye(3), rtol=1e-9, atol=1e-12 * squared):
+        return None
+    return float(np.sqrt(squared))
@@ -0,0 +1,78 @@
+import numpy as np
+from profiler import timed
+
+def triangulate_faces(faces):
+    """Return faces as an (M, 3) array, fan-triangulating polygons"""
+    if isinstance(faces, np.ndarray) and faces.ndim == 2 and faces.shape[1] == 3:
+        return faces
+    if len(faces) and all(len(face) == 3 for face in faces):
+        return np.array(faces, dtype=np.int64)
+    triangles = []
+    for face in faces:
+        for i in range(1, len(face) - 1):
+            triangles.append((face[0], face[i], face[i + 1]))
+    return np.array(triangles, dtype=np.int64).reshape(-1, 3)
+
+def _edge_keys(faces, vertex_count):
+    """
+    Keys low * N + high of all face sides (one per side, not unique)
+
+    Edges referencing missing vertices are dropped.
+    """
+    if not isinstance(faces, np.ndarray):
+        if len(faces) and len(set(map(len, faces))) == 1:
+            faces = np.array(faces, dtype=np.int64)
+        else:
+            # Полигоны разного размера: ребра собираются по граням
+            pairs = [(face[i], face[(i + 1) % len(face)])
+                     for face in faces if len(face) >= 3 for i in range(len(face))]
+            faces = None
+            starts = np.array([a for a, _ in pairs], dtype=np.int64)
+            ends = np.array([b for _, b in pairs], dtype=np.int64)
+
+    if faces is not None:
+        if faces.ndim != 2 or faces.shape[1] < 3:
+            return np.empty(0, dtype=np.int64)
+        starts = faces.reshape(-1).astype(np.int64)
+        ends = np.roll(faces, -1, axis=1).reshape(-1).astype(np.int64)
+
+    low = np.minimum(starts, ends)
+    high = np.maximum(starts, ends)
+    valid = (high < vertex_count) & (low >= 0)
+    # Ключ ребра low * N + high: уникальность по одному целому вместо пары
+    return low[valid] * max(vertex_count, 1) + high[valid]
+
+def _sorted_runs(keys):
+    """Sort keys; return the unique keys and how many times each occurs"""
+    keys = np.sort(keys)
+    starts = np.flatnonzero(np.concatenate((keys[:1] == keys[:1], keys[1:] != keys[:-1])))
+    counts = np.diff(np.append(starts, len(keys)))
+    return keys[starts], counts
+
+@timed("unique_edges")
+def unique_edges(faces, vertex_count):
+    """
+    Unique undirected edges of a mesh
+
+    Args:
+        faces: Array (M, K) or list of face indices (polygons allowed)
+        vertex_count: Number of vertices; edges referencing missing vertices are dropped
+
+    Returns:
+        Array (E, 2) of vertex index pairs, smaller index first
+    """
+    edges, _ = edge_face_counts(faces, vertex_count)
+    return edges
+
+def edge_face_counts(faces, vertex_count):
+    """
+    Unique undirected edges and the number of face sides on each of them
+
+    A closed two-manifold mesh has exactly 2 for every edge; 1 marks a
+    boundary edge and more than 2 a non-manifold edge.
+
+    Returns:
+        edges (E, 2) as in unique_edges and counts (E,)
+    """
+    keys, counts = _sorted_runs(_edge_keys(faces, vertex_count))
+    return np.column_stack(np.divmod(keys, max(vertex_count, 1))), counts
@@ -1,178 +1,790 @@
 import numpy as np
+from array import array
+from profiler import timed
+
+class OBJData:
+    """
+    Result of OBJLoader.parse()
+
+    Attributes:
+        vertices: Array (N, 3)
+        faces: Array (M, 3) of 0-based indices when triangulated, otherwise None
+        face_indices, face_offsets: Polygons as a flat index array and offsets
+            (M + 1); polygon i is face_indices[face_offsets[i]:face_offsets[i + 1]].
+            For triangulated data these describe the triangles.
+        texture_coords: Array (K, 2) or None if uv were not kept
+        normals: Array (K, 3) or None if normals were not kept
+        face_texture_indices, face_normal_indices: Per-corner indices laid out
+            like face_indices (-1 where a corner has none), or None
+        groups: OBJGroup list (object / group / material runs) with face ranges
+        material_libraries: File names from mtllib statements
+        vertex_ids: For partially loaded data, the file-wide index of each vertex
+    """
+
+    def __init__(self):
+        self.vertices = None
+        self.faces = None
+        self.face_indices = None
+        self.face_offsets = None
+        self.texture_coords = None
+        self.normals = None
+        self.face_texture_indices = None
+        self.face_normal_indices = None
+        self.groups = []
+        self.material_libraries = []
+        self.vertex_ids = None
+
+    def polygons(self):
+        """Faces as a list of index lists"""
+        indices = self.face_indices.tolist()
+        offsets = self.face_offsets.tolist()
+        return [indices[start:stop] for start, stop in zip(offsets[:-1], offsets[1:])]
+
+class OBJGroup:
+    """
+    Faces of an OBJ file that share one object, group and material
+
+    Attributes:
+        face_ranges: (face_start, face_end) ranges in the face order of the
+            whole file (triangles for OBJLoader.build_index())
+        byte_ranges: (byte_start, byte_end, vertex_base) runs of the file that
+            hold these faces; vertex_base is the number of vertices defined
+            before the run (needed to resolve relative indices)
+    """
+
+    def __init__(self, object_name=None, group_name=None, material=None):
+        self.object_name = object_name
+        self.group_name = group_name
+        self.material = material
+        self.face_ranges = []
+        self.byte_ranges = []
+
+    @property
+    def key(self):
+        return (self.object_name, self.group_name, self.material)
+
+    @property
+    def face_count(self):
+        return sum(end - start for start, end in self.face_ranges)
+
+    def label(self):
+        name = " / ".join(part for part in (self.object_name, self.group_name) if part) or "default"
+        if self.material:
+            name += f" [{self.material}]"
+        return name
+
+class OBJIndex:
+    """
+    Byte level index of an OBJ file built by OBJLoader.build_index()
+
+    Attributes:
+        groups: OBJGroup list in order of first appearance
+        vertex_blocks: (byte_start, byte_end, first_vertex, count) runs of
+            vertex lines
+    """
+
+    def __init__(self, filename):
+        self.filename = filename
+        self.groups = []
+        self.vertex_blocks = []
+        self.material_libraries = []
+        self.vertex_count = 0
+        self.face_count = 0
+
+    def find(self, label):
+        for group in self.groups:
+            if group.label() == label:
+                return group
+        return None
+
+class _GroupTracker:
+    """Collects object / group / material runs while a file is scanned"""
 
-class OBJLoader:
     def __init__(self):
-        pass
-    
+        self.groups = {}
+        self.object_name = None
+        self.group_name = None
+        self.material = None
+        self.run_face_start = 0
+        self.run_byte_start = 0
+        self.run_vertex_base = 0
+        # (keyword, name, face_count) каждого переключения: части файла,
+        # разобранные параллельно, воспроизводятся в одном трекере
+        self.events = []
+
+    def switch(self, keyword, name, face_count, byte_offset=0, vertex_count=0):
+        """Close the current run and start a new one after an o/g/usemtl line"""
+        self.events.append((keyword, name, face_count))
+        self.close(face_count, byte_offset)
+        if keyword == b'o':
+            self.object_name = name
+            self.group_name = None
+        elif keyword == b'g':
+            self.group_name = name
+        else:
+            self.material = name
+        self.run_face_start = face_count
+        self.run_vertex_base = vertex_count
+
+    def close(self, face_count, byte_offset=0):
+        if face_count > self.run_face_start:
+            key = (self.object_name, self.group_name, self.material)
+            group = self.groups.get(key)
+            if group is None:
+                group = self.groups[key] = OBJGroup(*key)
+            group.face_ranges.append((self.run_face_start, face_count))
+            group.byte_ranges.append((self.run_byte_start, byte_offset, self.run_vertex_base))
+        self.run_face_start = face_count
+        self.run_byte_start = byte_offset
+
+    def result(self):
+        return list(self.groups.values())
+
+class _IndexScan:
+    """
+    Structure of a run of OBJ lines found without parsing numbers
+
+    Byte offsets, vertex and face counts are relative to the start of the
+    run, so the chunks of a file can be scanned separately (in parallel)
+    and joined with _join_index_scans().
+    """
+
+    def __init__(self):
+        self.events = []            # (keyword, name, face_count, byte_offset, vertex_count)
+        self.vertex_blocks = []     # (byte_start, byte_end или None, если блок не закрыт, first, count)
+        self.first_face = None      # смещение первой строки f
+        self.material_libraries = []
+        self.vertex_count = 0
+        self.face_count = 0
+        self.size = 0
+
+    def feed(self, lines):
+        vertex_count = 0
+        face_count = 0
+        offset = 0
+        block_start = None
+        block_first = 0
+
+        for line in lines:
+            if line.startswith(b'v '):
+                keyword = b'v'
+            elif line.startswith(b'f '):
+                keyword = b'f'
+            else:
+                parts = line.split(None, 1)
+                keyword = parts[0] if parts else b''
+
+            if keyword == b'v':
+                if block_start is None:
+                    block_start = offset
+                    block_first = vertex_count
+                vertex_count += 1
+
+            elif keyword == b'f':
+                if self.first_face is None:
+                    self.first_face = offset
+                if block_start is not None:
+                    self.vertex_blocks.append((block_start, offset, block_first,
+                                               vertex_count - block_first))
+                    block_start = None
+                # После триангуляции N-угольник дает N - 2 треугольника
+                face_count += max(len(line.split()) - 3, 0)
+
+            elif keyword in (b'o', b'g', b'usemtl'):
+                name = b' '.join(line.split()[1:]).decode('utf-8', 'replace') or None
+                self.events.append((keyword, name, face_count, offset + len(line), vertex_count))
+
+            elif keyword == b'mtllib':
+                self.material_libraries.extend(
+                    part.decode('utf-8', 'replace') for part in line.split()[1:]
+                )
+
+            offset += len(line)
+
+        if block_start is not None:
+            # Блок вершин может продолжиться в следующей части файла
+            self.vertex_blocks.append((block_start, None, block_first, vertex_count - block_first))
+        self.vertex_count = vertex_count
+        self.face_count = face_count
+        self.size = offset
+
+def _join_index_scans(filename, scans):
+    """Build an OBJIndex from the scans of consecutive chunks of a file"""
+    index = OBJIndex(filename)
+    tracker = _GroupTracker()
+    offset = 0
+    vertex_base = 0
+    face_base = 0
+    open_block = None  # (byte_start, first, count) блока, не закрытого строкой f
+
+    for scan in scans:
+        for keyword, name, face_count, byte_offset, vertex_count in scan.events:
+            tracker.switch(keyword, name, face_base + face_count, offset + byte_offset,
+                           vertex_base + vertex_count)
+        blocks = [(offset + start, None if end is None else offset + end, vertex_base + first, count)
+                  for start, end, first, count in scan.vertex_blocks]
+
+        if open_block is not None:
+            start, first, count = open_block
+            if blocks and (scan.first_face is None or blocks[0][0] < offset + scan.first_face):
+                # Вершины в начале части продолжают блок предыдущей части
+                _, end, _, more = blocks.pop(0)
+                count += more
+            else:
+                end = None if scan.first_face is None else offset + scan.first_face
+            open_block = None
+            blocks.insert(0, (start, end, first, count))
+
+        for start, end, first, count in blocks:
+            if end is None:
+                open_block = (start, first, count)
+            else:
+                index.vertex_blocks.append((start, end, first, count))
+
+        index.material_libraries.extend(scan.material_libraries)
+        offset += scan.size
+        vertex_base += scan.vertex_count
+        face_base += scan.face_count
+
+    if open_block is not None:
+        start, first, count = open_block
+        index.vertex_blocks.append((start, offset, first, count))
+    tracker.close(face_base, offset)
+
+    index.groups = tracker.result()
+    index.vertex_count = vertex_base
+    index.face_count = face_base
+    return index
+
+class _OBJParser:
+    """
+    Single pass OBJ parsing engine shared by all OBJLoader entry points.
+
+    Lines are fed as bytes; values go straight into typed array.array
+    buffers (amortized growth, no per-element Python lists). Face indices
+    are stored 1-based as written and shifted once at the end.
+    """
+
+    def __init__(self, triangulate=True, keep_uv=False, keep_normals=False, strict=False,
+                 keep_vertices=True, vertex_base=0, relative_bias=0):
+        self.triangulate = triangulate
+        self.keep_uv = keep_uv
+        self.keep_normals = keep_normals
+        self.strict = strict
+        # keep_vertices=False только считает строки v (ленивая загрузка групп)
+        self.keep_vertices = keep_vertices
+        # Относительные индексы сдвигаются на relative_bias, чтобы их можно было
+        # отличить и поправить позже (параллельный разбор по частям файла)
+        self.relative_bias = relative_bias
+        self.groups = _GroupTracker()
+        self.material_libraries = []
+
+        self.vertices = array('d')
+        self.texture_coords = array('d')
+        self.normals = array('d')
+        self.face_indices = array('q')
+        self.face_sizes = array('q')
+        self.face_texture_indices = array('q')
+        self.face_normal_indices = array('q')
+
+        self.vertex_count = vertex_base
+        self.texture_count = 0
+        self.normal_count = 0
+
+    def error(self, line_num, line, message):
+        text = line.decode('utf-8', 'replace').strip()
+        if self.strict:
+            raise ValueError(f"Line {line_num}: {message}: {text}")
+        print(f"Warning: Error parsing line {line_num}: {text}")
+        print(f"Error: {message}")
+
+    def feed(self, lines, first_line=1):
+        # Локальные ссылки: цикл выполняется для каждой строки файла
+        vertices_extend = self.vertices.extend
+        faces_extend = self.face_indices.extend
+        sizes_append = self.face_sizes.append
+        triangulate = self.triangulate
+        keep_attributes = self.keep_uv or self.keep_normals
+        keep_vertices = self.keep_vertices
+        vertex_count = self.vertex_count
+
+        for line_num, line in enumerate(lines, first_line):
+            parts = line.split()
+            if not parts:
+                continue
+
+            keyword = parts[0]
+            try:
+                if keyword == b'v':
+                    # Vertex: v x y z [w]; короткие строки пропускаются, как раньше
+                    if len(parts) < 4:
+                        continue
+                    if keep_vertices:
+                        # Кортеж: при ошибке в любой координате в буфер ничего не попадает
+                        vertices_extend(tuple(map(float, parts[1:4])))
+                    vertex_count += 1
+
+                elif keyword == b'f':
+                    # Face: can have various formats:
+                    # f v1 v2 v3 ...
+                    # f v1/vt1 v2/vt2 v3/vt3 ...
+                    # f v1/vt1/vn1 v2/vt2/vn2 v3/vt3/vn3 ...
+                    # f v1//vn1 v2//vn2 v3//vn3 ...
+                    size = len(parts) - 1
+                    if size < 3:
+                        continue
+                    if b'/' not in line:
+                        polygon = list(map(int, parts[1:]))
+                    elif keep_attributes:
+                        self.vertex_count = vertex_count
+                        self.parse_face_attributes(parts[1:])
+                        continue
+                    else:
+                        polygon = [int(corner.split(b'/', 1)[0]) for corner in parts[1:]]
+                    if min(polygon) <= 0:
+                        polygon = self.resolve_relative(polygon, vertex_count)
+
+                    if size == 3 or not triangulate:
+                        faces_extend(polygon)
+                        sizes_append(size)
+                    else:
+                        # Веерная триангуляция N-угольника
+                        first = polygon[0]
+                        for i in range(1, size - 1):
+                            faces_extend((first, polygon[i], polygon[i + 1]))
+                            sizes_append(3)
+                        size = 3 * (size - 2)
+                    if keep_attributes:
+                        # У углов грани без "/" нет текстурных координат и нормалей
+                        self.pad_attributes(size)
+
+                elif keyword == b'vt':
+                    # Texture coordinate: vt u [v [w]]
+                    if len(parts) < 2:
+                        continue
+                    if self.keep_uv:
+                        self.texture_coords.extend(
+                            (float(parts[1]), float(parts[2]) if len(parts) > 2 else 0.0)
+                        )
+                    self.texture_count += 1
+
+                elif keyword == b'vn':
+                    # Vertex normal: vn i j k
+                    if len(parts) < 4:
+                        continue
+                    if self.keep_normals:
+                        self.normals.extend(tuple(map(float, parts[1:4])))
+                    self.normal_count += 1
+
+                elif keyword in (b'o', b'g', b'usemtl'):
+                    name = b' '.join(parts[1:]).decode('utf-8', 'replace') or None
+                    self.groups.switch(keyword, name, len(self.face_sizes))
+
+                elif keyword == b'mtllib':
+                    self.material_libraries.extend(
+                        part.decode('utf-8', 'replace') for part in parts[1:]
+                    )
+
+            except ValueError as e:
+                self.error(line_num, line, e)
+
+        self.vertex_count = vertex_count
+
+    def resolve_relative(self, indices, count):
+        """Turn negative (relative) indices into 1-based absolute ones"""
+        resolved = []
+        for index in indices:
+            if index < 0:
+                index = count + index + 1 - self.relative_bias
+            elif index == 0:
+                raise ValueError("index 0 is not valid in OBJ")
+            resolved.append(index)
+        return resolved
+
+    def pad_attributes(self, count):
+        if self.keep_uv:
+            self.face_texture_indices.extend([0] * count)
+        if self.keep_normals:
+            self.face_normal_indices.extend([0] * count)
+
+    def parse_face_attributes(self, corners):
+        """Slow path for faces when uv or normal indices are kept"""
+        polygon, uv, normal = [], [], []
+        for corner in corners:
+            fields = corner.split(b'/')
+            polygon.append(int(fields[0]))
+            uv.append(int(fields[1]) if len(fields) > 1 and fields[1] else 0)
+            normal.append(int(fields[2]) if len(fields) > 2 and fields[2] else 0)
+
+        # 0 здесь означает отсутствующий атрибут, индекс вершины обязателен
+        polygon = self.resolve_relative(polygon, self.vertex_count)
+        uv = [self.texture_count + i + 1 if i < 0 else i for i in uv]
+        normal = [self.normal_count + i + 1 if i < 0 else i for i in normal]
+
+        size = len(polygon)
+        if self.triangulate and size > 3:
+            order = []
+            for i in range(1, size - 1):
+                order.extend((0, i, i + 1))
+            polygon = [polygon[i] for i in order]
+            uv = [uv[i] for i in order]
+            normal = [normal[i] for i in order]
+            self.face_sizes.extend([3] * (size - 2))
+        else:
+            self.face_sizes.append(size)
+
+        self.face_indices.extend(polygon)
+        if self.keep_uv:
+            self.face_texture_indices.extend(uv)
+        if self.keep_normals:
+            self.face_normal_indices.extend(normal)
+
+    def result(self, dtype):
+        data = OBJData()
+        data.vertices = np.frombuffer(self.vertices, dtype=np.float64).reshape(-1, 3).astype(dtype)
+        # Индексы в файле с 1, отсутствующие атрибуты (0) становятся -1
+        data.face_indices = np.frombuffer(self.face_indices, dtype=np.int64) - 1
+        data.face_offsets = np.zeros(len(self.face_sizes) + 1, dtype=np.int64)
+        np.cumsum(np.frombuffer(self.face_sizes, dtype=np.int64), out=data.face_offsets[1:])
+        if self.keep_uv:
+            data.texture_coords = np.frombuffer(self.texture_coords, dtype=np.float64).reshape(-1, 2)
+            data.face_texture_indices = np.frombuffer(self.face_texture_indices, dtype=np.int64) - 1
+        if self.keep_normals:
+            data.normals = np.frombuffer(self.normals, dtype=np.float64).reshape(-1, 3)
+            data.face_normal_indices = np.frombuffer(self.face_normal_indices, dtype=np.int64) - 1
+
+        self.groups.close(len(self.face_sizes))
+        data.groups = self.groups.result()
+        data.material_libraries = self.material_libraries
+
+        if self.keep_vertices:
+            self.validate(data)
+        if self.triangulate:
+            data.faces = data.face_indices.reshape(-1, 3)
+        return data
+
+    def validate(self, data):
+        """Check that every face references an existing vertex"""
+        indices = data.face_indices
+        if len(indices) == 0:
+            return
+        invalid = (indices < 0) | (indices >= len(data.vertices))
+        if not invalid.any():
+            return
+
+        face_ids = np.repeat(np.arange(len(data.face_offsets) - 1), np.diff(data.face_offsets))
+        bad_faces = np.unique(face_ids[invalid])
+        if self.strict:
+            raise ValueError(f"{len(bad_faces)} face(s) reference missing vertices, "
+                             f"first is face {bad_faces[0] + 1}")
+        print(f"Warning: dropping {len(bad_faces)} face(s) that reference missing vertices")
+
+        # Сдвигаем диапазоны групп на число удаленных граней перед ними
+        for group in data.groups:
+            group.face_ranges = [
+                (start - int(np.searchsorted(bad_faces, start)), end - int(np.searchsorted(bad_faces, end)))
+                for start, end in group.face_ranges
+            ]
+
+        keep_corners = ~np.isin(face_ids, bad_faces)
+        sizes = np.delete(np.diff(data.face_offsets), bad_faces)
+        data.face_indices = data.face_indices[keep_corners]
+        data.face_offsets = np.concatenate(([0], np.cumsum(sizes)))
+        if data.face_texture_indices is not None:
+            data.face_texture_indices = data.face_texture_indices[keep_corners]
+        if data.face_normal_indices is not None:
+            data.face_normal_indices = data.face_normal_indices[keep_corners]
+
+class OBJLoader:
+    def __init__(self, dtype=np.float64):
+        self.dtype = dtype
+
+    @timed("OBJLoader.parse")
+    def parse(self, filename, triangulate=True, keep_uv=False, keep_normals=False, strict=False):
+        """
+        Parse an OBJ file in a single pass
+
+        Args:
+            filename: Path to the OBJ file
+            triangulate: Fan-triangulate polygons (faces become an (M, 3) array)
+                         or keep them as they are
+            keep_uv: Keep texture coordinates and per-corner uv indices
+            keep_normals: Keep normals and per-corner normal indices
+            strict: Raise ValueError on malformed lines and faces that reference
+                    missing vertices instead of warning and skipping them
+
+        Negative (relative) indices are resolved against the elements defined
+        so far, as the OBJ format specifies. Lines with too few values (a
+        vertex without 3 coordinates, a face with fewer than 3 corners) are
+        skipped silently in both modes.
+
+        Returns:
+            OBJData
+        """
+        parser = _OBJParser(triangulate, keep_uv, keep_normals, strict)
+        with open(filename, 'rb') as file:
+            parser.feed(file)
+        return parser.result(self.dtype)
+
+    @timed("OBJLoader.load_obj")
     def load_obj(self, filename):
         """
         Load OBJ file with support for:
         - vertices (v)
         - texture coordinates (vt)
         - vertex normals (vn)
-        - faces with various formats (f)
-        - materials (mtllib, usemtl)
-        - objects (o)
-        - smoothing groups (s)
+        - faces with various formats (f), including negative indices
+
+        Polygons are kept as they are; malformed lines raise ValueError,
+        lines with too few values are skipped.
+        Returns vertices and faces as a list of index lists.
         """
-        vertices = []
-        texture_coords = []
-        normals = []
-        faces = []
-        
-        with open(filename, 'r') as file:
-            for line in file:
-                line = line.strip()
-                if not line or line.startswith('#'):
-                    continue
-                
-                parts = line.split()
-                if not parts:
-                    continue
-                
-                keyword = parts[0]
-                data = parts[1:]
-                
-                if keyword == 'v':
-                    # Vertex: v x y z [w]
-                    if len(data) >= 3:
-                        vertex = [float(data[0]), float(data[1]), float(data[2])]
-                        vertices.append(vertex)
-                
-                elif keyword == 'vt':
-                    # Texture coordinate: vt u v [w]
-                    if len(data) >= 2:
-                        tex_coord = [float(data[0]), float(data[1])]
-                        texture_coords.append(tex_coord)
-                
-                elif keyword == 'vn':
-                    # Vertex normal: vn i j k
-                    if len(data) >= 3:
-                        normal = [float(data[0]), float(data[1]), float(data[2])]
-                        normals.append(normal)
-                
-                elif keyword == 'f':
-                    # Face: can have various formats:
-                    # f v1 v2 v3 ...
-                    # f v1/vt1 v2/vt2 v3/vt3 ...
-                    # f v1/vt1/vn1 v2/vt2/vn2 v3/vt3/vn3 ...
-                    # f v1//vn1 v2//vn2 v3//vn3 ...
-                    if len(data) >= 3:
-                        face_vertices = []
-                        for part in data:
-                            # Parse vertex indices
-                            vertex_parts = part.split('/')
-                            
-                            # Vertex index (always required)
-                            if vertex_parts[0]:
-                                vertex_idx = int(vertex_parts[0]) - 1  # Convert to 0-based
-                                face_vertices.append(vertex_idx)
-                        
-                        faces.append(face_vertices)
-        
-        return np.array(vertices), faces
-    
+        data = self.parse(filename, triangulate=False, strict=True)
+        return data.vertices, data.polygons()
+
+    @timed("OBJLoader.load_obj_advanced")
     def load_obj_advanced(self, filename):
         """
         Advanced loader that handles more OBJ features
-        Returns vertices, faces, and additional information
+
+        Polygons are triangulated, malformed lines are reported and skipped.
+        Returns vertices (N, 3), faces (M, 3), texture coordinates (K, 2)
+        and normals (L, 3) as arrays.
         """
-        vertices = []
-        texture_coords = []
-        normals = []
-        faces = []
-        current_material = None
-        current_object = None
-        
-        with open(filename, 'r', encoding='utf-8') as file:
-            for line_num, line in enumerate(file, 1):
-                line = line.strip()
-                if not line or line.startswith('#'):
-                    continue
-                
-                try:
-                    parts = line.split()
-                    if not parts:
-                        continue
-                    
-                    keyword = parts[0]
-                    data = parts[1:]
-                    
-                    if keyword == 'v':
-                        if len(data) >= 3:
-                            vertex = [float(data[0]), float(data[1]), float(data[2])]
-                            vertices.append(vertex)
-                    
-                    elif keyword == 'vt':
-                        if len(data) >= 2:
-                            tex_coord = [float(data[0]), float(data[1])]
-                            texture_coords.append(tex_coord)
-                    
-                    elif keyword == 'vn':
-                        if len(data) >= 3:
-                            normal = [float(data[0]), float(data[1]), float(data[2])]
-                            normals.append(normal)
-                    
-                    elif keyword == 'f':
-                        if len(data) >= 3:
-                            face_vertices = []
-                            for part in data:
-                                vertex_parts = part.split('/')
-                                
-                                # Handle different face formats
-                                if len(vertex_parts) == 1:
-                                    # f v1 v2 v3
-                                    vertex_idx = int(vertex_parts[0]) - 1
-                                    face_vertices.append(vertex_idx)
-                                elif len(vertex_parts) >= 2:
-                                    # f v1/vt1 v2/vt2 v3/vt3
-                                    # f v1/vt1/vn1 v2/vt2/vn2 v3/vt3/vn3
-                                    # f v1//vn1 v2//vn2 v3//vn3
-                                    if vertex_parts[0]:  # Vertex index
-                                        vertex_idx = int(vertex_parts[0]) - 1
-                                        face_vertices.append(vertex_idx)
-                            
-                            if len(face_vertices) >= 3:
-                                # Convert polygon to triangles if needed
-                                if len(face_vertices) == 3:
-                                    faces.append(face_vertices)
-                                elif len(face_vertices) == 4:
-                                    # Quad to two triangles
-                                    faces.append([face_vertices[0], face_vertices[1], face_vertices[2]])
-                                    faces.append([face_vertices[0], face_vertices[2], face_vertices[3]])
-                                else:
-                                    # N-gon to triangles using fan triangulation
-                                    for i in range(1, len(face_vertices) - 1):
-                                        faces.append([face_vertices[0], face_vertices[i], face_vertices[i + 1]])
-                
-                except Exception as e:
-                    print(f"Warning: Error parsing line {line_num}: {line}")
-                    print(f"Error: {e}")
-                    continue
-        
-        return np.array(vertices), faces, texture_coords, normals
-    
+        data = self.parse(filename, triangulate=True, keep_uv=True, keep_normals=True, strict=False)
+        return data.vertices, data.faces, data.texture_coords, data.normals
+
+    @timed("OBJLoader.load_simple_obj")
     def load_simple_obj(self, filename):
-        """Simple loader that extracts only vertices and faces"""
-        vertices = []
+        """Simple loader that extracts only vertices and faces (polygons kept)"""
+        data = self.parse(filename, triangulate=False, strict=True)
+        return data.vertices, data.polygons()
+
+    @timed("OBJLoader.build_index")
+    def build_index(self, filename):
+        """
+        Scan an OBJ file without parsing numbers and index its structure
+
+        Records byte ranges and triangle ranges of every object / group /
+        material run, plus the byte ranges of vertex blocks, so single
+        groups can be loaded later with load_groups().
+
+        Returns:
+            OBJIndex
+        """
+        scan = _IndexScan()
+        with open(filename, 'rb') as file:
+            scan.feed(file)
+        return _join_index_scans(filename, [scan])
+
+    @timed("OBJLoader.load_groups")
+    def load_groups(self, index, groups):
+        """
+        Load only the faces of the given groups and the vertices they use
+
+        Args:
+            index: OBJIndex from build_index()
+            groups: OBJGroup objects from index.groups
+
+        Returns:
+            OBJData with compact vertices, triangulated faces remapped to them,
+            and vertex_ids holding the file-wide index of each vertex
+        """
+        parts = []
+        with open(index.filename, 'rb') as file:
+            for group in groups:
+                for byte_start, byte_end, vertex_base in group.byte_ranges:
+                    file.seek(byte_start)
+                    parser = _OBJParser(triangulate=True, keep_vertices=False, vertex_base=vertex_base)
+                    parser.feed(file.read(byte_end - byte_start).splitlines())
+                    parts.append(np.frombuffer(parser.face_indices, dtype=np.int64) - 1)
+
+            faces = np.concatenate(parts) if parts else np.empty(0, dtype=np.int64)
+            faces = faces.reshape(-1, 3)
+            invalid = ((faces < 0) | (faces >= index.vertex_count)).any(axis=1)
+            if invalid.any():
+                print(f"Warning: dropping {invalid.sum()} face(s) that reference missing vertices")
+                faces = faces[~invalid]
+
+            used = np.unique(faces)
+            vertices = self._read_vertices(file, index, used)
+
+        data = OBJData()
+        data.vertices = vertices
+        data.faces = np.searchsorted(used, faces)
+        data.face_indices = data.faces.reshape(-1)
+        data.face_offsets = np.arange(0, len(data.face_indices) + 1, 3, dtype=np.int64)
+        data.vertex_ids = used
+        data.material_libraries = index.material_libraries
+
+        # Диапазоны граней групп в загруженных данных
+        start = 0
+        for group in groups:
+            loaded = OBJGroup(*group.key)
+            end = start + group.face_count
+            loaded.face_ranges.append((start, min(end, len(data.faces))))
+            data.groups.append(loaded)
+            start = end
+        return data
+
+    def _read_vertices(self, file, index, vertex_ids):
+        """Parse only the vertex blocks that contain the requested vertices"""
+        vertices = np.empty((len(vertex_ids), 3), dtype=self.dtype)
+        for byte_start, byte_end, first, count in index.vertex_blocks:
+            lo, hi = np.searchsorted(vertex_ids, (first, first + count))
+            if lo == hi:
+                continue
+            file.seek(byte_start)
+            parser = _OBJParser(triangulate=False)
+            parser.feed(file.read(byte_end - byte_start).splitlines())
+            block = np.frombuffer(parser.vertices, dtype=np.float64).reshape(-1, 3)
+            if len(block) != count:
+                # Пропущенная некорректная строка v сдвинула бы номера вершин блока
+                raise ValueError(f"{count - len(block)} malformed vertex line(s) in bytes "
+                                 f"{byte_start}-{byte_end}; load the whole file instead")
+            vertices[lo:hi] = block[vertex_ids[lo:hi] - first]
+        return vertices
+
+# Типы свойств PLY и соответствующие типы NumPy (без порядка байт)
+_PLY_TYPES = {
+    'char': 'i1', 'int8': 'i1', 'uchar': 'u1', 'uint8': 'u1',
+    'short': 'i2', 'int16': 'i2', 'ushort': 'u2', 'uint16': 'u2',
+    'int': 'i4', 'int32': 'i4', 'uint': 'u4', 'uint32': 'u4',
+    'float': 'f4', 'float32': 'f4', 'double': 'f8', 'float64': 'f8',
+}
+
+class PLYLoader:
+    def __init__(self, dtype=np.float64):
+        self.dtype = dtype
+
+    def _read_header(self, file):
+        if file.readline().strip() != b'ply':
+            raise ValueError("Not a PLY file")
+        byte_order = None
+        elements = []   # [имя, количество, [(имя свойства, тип или (тип счетчика, тип элемента))]]
+        while True:
+            line = file.readline()
+            if not line:
+                raise ValueError("PLY header has no end_header")
+            parts = line.decode('ascii', 'replace').split()
+            if not parts or parts[0] in ('comment', 'obj_info'):
+                continue
+            if parts[0] == 'end_header':
+                break
+            if parts[0] == 'format':
+                if parts[1] == 'binary_little_endian':
+                    byte_order = '<'
+                elif parts[1] == 'binary_big_endian':
+                    byte_order = '>'
+                else:
+                    raise ValueError(f"Unsupported PLY format: {parts[1]} (only binary PLY is supported)")
+            elif parts[0] == 'element':
+                elements.append([parts[1], int(parts[2]), []])
+            elif parts[0] == 'property':
+                if parts[1] == 'list':
+                    elements[-1][2].append((parts[4], (_PLY_TYPES[parts[2]], _PLY_TYPES[parts[3]])))
+                else:
+                    elements[-1][2].append((parts[2], _PLY_TYPES[parts[1]]))
+        if byte_order is None:
+            raise ValueError("PLY header has no format line")
+        return byte_order, elements
+
+    def _read_fixed(self, buffer, offset, count, properties, byte_order):
+        dtype = np.dtype([(name, byte_order + kind) for name, kind in properties])
+        records = np.frombuffer(buffer, dtype=dtype, count=count, offset=offset)
+        return records, offset + dtype.itemsize * count
+
+    def _read_lists(self, buffer, offset, count, properties, byte_order):
+        """Read an element with one list property (faces); returns (faces, new offset)"""
+        (name, (count_kind, item_kind)), = [p for p in properties if isinstance(p[1], tuple)]
+        if len(properties) != 1:
+            raise ValueError("Only face elements with a single list property are supported")
+        count_size = np.dtype(count_kind).itemsize
+        item_dtype = np.dtype(byte_order + item_kind)
+        if count == 0:
+            return np.empty((0, 3), dtype=np.int64), offset
+
+        # Обычно все грани одного размера: читаем одним структурированным массивом
+        size = int(np.frombuffer(buffer, dtype=byte_order + count_kind, count=1, offset=offset)[0])
+        record = np.dtype([('count', byte_order + count_kind), ('indices', item_dtype, (size,))])
+        if offset + record.itemsize * count <= len(buffer):
+            records = np.frombuffer(buffer, dtype=record, count=count, offset=offset)
+            if np.all(records['count'] == size):
+                return records['indices'].astype(np.int64), offset + record.itemsize * count
+
+        # Грани разного размера
         faces = []
-        
-        with open(filename, 'r') as file:
-            for line in file:
-                line = line.strip()
-                if line.startswith('v ') and not line.startswith('vt ') and not line.startswith('vn '):
-                    coords = list(map(float, line.split()[1:4]))
-                    vertices.append(coords)
-                elif line.startswith('f '):
-                    face_data = line.split()[1:]
-                    face_vertices = []
-                    
-                    for vertex_str in face_data:
-                        # Extract vertex index (first part before any '/')
-                        vertex_idx = int(vertex_str.split('/')[0]) - 1
-                        face_vertices.append(vertex_idx)
-                    
-                    if len(face_vertices) >= 3:
-                        faces.append(face_vertices)
-        
-        return np.array(vertices), faces
\ No newline at end of file
+        for _ in range(count):
+            size = int(np.frombuffer(buffer, dtype=byte_order + count_kind, count=1, offset=offset)[0])
+            offset += count_size
+            faces.append(np.frombuffer(buffer, dtype=item_dtype, count=size, offset=offset).tolist())
+            offset += item_dtype.itemsize * size
+        return faces, offset
+
+    @timed("PLYLoader.load_ply")
+    def load_ply(self, filename):
+        """
+        Load vertices and faces from a binary PLY file
+
+        Returns:
+            vertices (N, 3) and faces as an (M, K) array when all faces have
+            the same size, otherwise a list of index lists
+        """
+        with open(filename, 'rb') as file:
+            byte_order, elements = self._read_header(file)
+            buffer = file.read()
+
+        vertices = np.empty((0, 3), dtype=self.dtype)
+        faces = np.empty((0, 3), dtype=np.int64)
+        offset = 0
+        for name, count, properties in elements:
+            if any(isinstance(kind, tuple) for _, kind in properties):
+                data, offset = self._read_lists(buffer, offset, count, properties, byte_order)
+            else:
+                data, offset = self._read_fixed(buffer, offset, count, properties, byte_order)
+
+            if name == 'vertex':
+                vertices = np.column_stack([data['x'], data['y'], data['z']]).astype(self.dtype)
+            elif name == 'face':
+                faces = data
+        return vertices, faces
+
+class STLLoader:
+    def __init__(self, dtype=np.float64):
+        self.dtype = dtype
+
+    @timed("STLLoader.load_stl")
+    def load_stl(self, filename):
+        """
+        Load a binary STL file
+
+        Identical corner positions are welded into shared vertices, numbered
+        in order of first appearance.
+
+        Returns:
+            vertices (N, 3) and faces (M, 3)
+        """
+        from stl_writer import STL_TRIANGLE
+
+        with open(filename, 'rb') as file:
+            header = file.read(84)
+            if len(header) < 84:
+                raise ValueError("File is too short for a binary STL")
+            count = int(np.frombuffer(header, dtype='<u4', count=1, offset=80)[0])
+            records = np.fromfile(file, dtype=STL_TRIANGLE, count=count)
+        if len(records) != count:
+            if header.startswith(b'solid'):
+                raise ValueError("ASCII STL is not supported, only binary STL")
+            raise ValueError(f"STL declares {count} triangles but contains {len(records)}")
+
+        # "+ 0" превращает -0.0 в 0.0, чтобы сравнение по байтам совпадало с числовым
+        corners = np.ascontiguousarray(records['vertices'].reshape(-1, 3)) + np.float32(0)
+        keys = corners.view(np.dtype((np.void, corners.itemsize * 3))).reshape(-1)
+        _, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+        # Нумерация вершин в порядке первого появления
+        order = np.argsort(first)
+        rank = np.empty_like(order)
+        rank[order] = np.arange(len(order))
+        vertices = corners[first[order]].astype(self.dtype)
+        faces = rank[inverse.reshape(-1)].reshape(-1, 3)
+        return vertices, faces
@@ -1,7 +1,10 @@
+from profiler import timed
+
 class OBJWriter:
     def __init__(self):
         pass
     
+    @timed("OBJWriter.write_obj")
     def write_obj(self, filename, vertices, faces):
         """
         Write vertices and faces to OBJ file
@@ -25,6 +28,7 @@ class OBJWriter:
                     face_line += f" {vertex_index + 1}"
                 file.write(face_line + "\n")
     
+    @timed("OBJWriter.write_simple_obj")
     def write_simple_obj(self, filename, vertices, faces):
         """Alternative writer with simpler format"""
         with open(filename, 'w') as file:
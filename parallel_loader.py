@@ -0,0 +1,206 @@
+import io
+import mmap
+import os
+from concurrent.futures import ProcessPoolExecutor
+try:
+    from multiprocessing import resource_tracker, shared_memory
+except ImportError:
+    # Python 3.6/3.7: разделяемой памяти нет, файлы разбираются в текущем процессе
+    shared_memory = None
+
+import numpy as np
+from model_loader import (OBJData, OBJLoader, _GroupTracker, _IndexScan, _OBJParser,
+                          _join_index_scans)
+from profiler import timed
+
+# Файлы меньше этого размера разбираются в текущем процессе
+MIN_PARALLEL_BYTES = 8 * 1024 * 1024
+
+# Относительные индексы внутри части файла помечаются этим смещением:
+# после разбора они становятся сильно отрицательными и легко отличимы
+RELATIVE_BIAS = 1 << 62
+
+def split_ranges(buffer, parts):
+    """Split a buffer into up to `parts` byte ranges that end at line boundaries"""
+    size = len(buffer)
+    bounds = [0]
+    for i in range(1, parts):
+        position = buffer.find(b'\n', max(size * i // parts, bounds[-1]))
+        if position == -1:
+            break
+        if position + 1 > bounds[-1]:
+            bounds.append(position + 1)
+    if bounds[-1] != size:
+        bounds.append(size)
+    return list(zip(bounds[:-1], bounds[1:]))
+
+def _to_shared(buffer, dtype):
+    """Copy an array.array into a new shared memory block; returns (name, count)"""
+    source = np.frombuffer(buffer, dtype=dtype)
+    block = shared_memory.SharedMemory(create=True, size=max(source.nbytes, 1))
+    np.ndarray(source.shape, dtype=dtype, buffer=block.buf)[:] = source
+    name = block.name
+    block.close()
+    return name, len(source)
+
+def _take_shared(name, count, dtype, out):
+    """Copy a shared memory block into out and release it"""
+    block = shared_memory.SharedMemory(name=name)
+    try:
+        out[:] = np.ndarray((count,), dtype=dtype, buffer=block.buf)
+    finally:
+        block.close()
+        block.unlink()
+
+def _parse_range(filename, start, end, strict):
+    """Worker: parse one byte range of the file, return shared memory handles"""
+    with open(filename, 'rb') as file:
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            chunk = mapped[start:end]
+
+    parser = _OBJParser(triangulate=True, strict=strict, relative_bias=RELATIVE_BIAS)
+    parser.feed(chunk.splitlines())
+    del chunk
+
+    vertices = _to_shared(parser.vertices, np.float64)
+    faces = _to_shared(parser.face_indices, np.int64)
+    return vertices, faces, parser.vertex_count, (parser.groups.events, parser.material_libraries)
+
+def _scan_range(filename, start, end):
+    """Worker: index one byte range of the file"""
+    with open(filename, 'rb') as file:
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            chunk = mapped[start:end]
+
+    scan = _IndexScan()
+    scan.feed(io.BytesIO(chunk))
+    return scan
+
+class ParallelOBJLoader:
+    """
+    OBJ loader that parses large files on several cores
+
+    The file is memory mapped and split into byte ranges aligned to line
+    boundaries; each range is parsed in a worker process with the same
+    engine as OBJLoader.parse() and handed back through shared memory.
+    Chunks are stitched by offsetting relative face indices with the number
+    of vertices defined in the preceding chunks.
+
+    Only vertices, triangulated faces and object / group / material face
+    ranges are produced (no uv or normals); use OBJLoader for those.
+    Without multiprocessing.shared_memory (Python < 3.8) load() parses in
+    the current process.
+    Workers report where groups switch inside their range, so no separate
+    scan of the file is needed. build_index() splits the structure scan of
+    OBJLoader.build_index() the same way for lazy loading of large scenes.
+    """
+
+    def __init__(self, dtype=np.float64, workers=None, min_parallel_bytes=MIN_PARALLEL_BYTES):
+        self.dtype = dtype
+        self.workers = workers or os.cpu_count() or 1
+        self.min_parallel_bytes = min_parallel_bytes
+
+    @timed("ParallelOBJLoader.load")
+    def load(self, filename, strict=False):
+        """
+        Load vertices (N, 3) and triangles (M, 3) from an OBJ file
+
+        Returns:
+            OBJData
+        """
+        size = os.path.getsize(filename)
+        if self.workers == 1 or size < self.min_parallel_bytes or shared_memory is None:
+            return OBJLoader(self.dtype).parse(filename, triangulate=True, strict=strict)
+
+        with open(filename, 'rb') as file:
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                ranges = split_ranges(mapped, self.workers)
+
+        # Общий процесс учета ресурсов для родителя и рабочих процессов: блоки
+        # разделяемой памяти создаются в рабочих, а освобождаются здесь
+        resource_tracker.ensure_running()
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            futures = [pool.submit(_parse_range, filename, start, end, strict) for start, end in ranges]
+            try:
+                results = [future.result() for future in futures]
+            except Exception:
+                self._release(futures)
+                raise
+
+        return self._stitch(results, strict)
+
+    @timed("ParallelOBJLoader.build_index")
+    def build_index(self, filename):
+        """
+        Index an OBJ file like OBJLoader.build_index(), one chunk per worker
+
+        Returns:
+            OBJIndex
+        """
+        size = os.path.getsize(filename)
+        if self.workers == 1 or size < self.min_parallel_bytes:
+            return OBJLoader(self.dtype).build_index(filename)
+
+        with open(filename, 'rb') as file:
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                ranges = split_ranges(mapped, self.workers)
+
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            futures = [pool.submit(_scan_range, filename, start, end) for start, end in ranges]
+            scans = [future.result() for future in futures]
+        return _join_index_scans(filename, scans)
+
+    def _release(self, futures):
+        """Free shared memory of the chunks that finished before a failure"""
+        for future in futures:
+            if future.exception() is not None:
+                continue
+            (vertex_name, _), (face_name, _) = future.result()[:2]
+            for name in (vertex_name, face_name):
+                block = shared_memory.SharedMemory(name=name)
+                block.close()
+                block.unlink()
+
+    def _stitch(self, results, strict):
+        # Длины в элементах буферов: 3 координаты на вершину, 3 индекса на треугольник
+        vertex_total = sum(vertices[1] for vertices, faces, count, groups in results)
+        index_total = sum(faces[1] for vertices, faces, count, groups in results)
+        vertices = np.empty(vertex_total, dtype=np.float64)
+        faces = np.empty(index_total, dtype=np.int64)
+
+        vertex_offset = 0
+        index_offset = 0
+        vertex_base = 0
+        tracker = _GroupTracker()
+        material_libraries = []
+        for (vertex_name, vertex_len), (face_name, face_len), vertex_count, (events, libraries) in results:
+            _take_shared(vertex_name, vertex_len, np.float64,
+                         vertices[vertex_offset:vertex_offset + vertex_len])
+            chunk_faces = faces[index_offset:index_offset + face_len]
+            _take_shared(face_name, face_len, np.int64, chunk_faces)
+
+            # Относительные индексы отсчитывались от начала части файла
+            relative = chunk_faces < -(RELATIVE_BIAS >> 1)
+            chunk_faces[relative] += RELATIVE_BIAS + vertex_base
+
+            # Переключения групп части сдвигаются на число треугольников до нее
+            for keyword, name, face_count in events:
+                tracker.switch(keyword, name, index_offset // 3 + face_count)
+            material_libraries.extend(libraries)
+
+            vertex_offset += vertex_len
+            index_offset += face_len
+            vertex_base += vertex_count
+        tracker.close(index_total // 3)
+
+        data = OBJData()
+        data.vertices = vertices.reshape(-1, 3).astype(self.dtype, copy=False)
+        data.face_indices = faces - 1
+        data.face_offsets = np.arange(0, len(faces) + 1, 3, dtype=np.int64)
+        data.groups = tracker.result()
+        data.material_libraries = material_libraries
+
+        # Та же проверка ссылок на вершины, что и у однопоточного разбора
+        _OBJParser(strict=strict).validate(data)
+        data.faces = data.face_indices.reshape(-1, 3)
+        return data
@@ -0,0 +1,72 @@
+import numpy as np
+from profiler import timed
+
+class PLYWriter:
+    def __init__(self):
+        pass
+
+    @timed("PLYWriter.write_ply")
+    def write_ply(self, filename, vertices, faces):
+        """
+        Write vertices and faces to a binary little-endian PLY file
+
+        Vertices keep their precision (float32 -> 'float', otherwise 'double'),
+        so reading the file back with PLYLoader gives the same arrays.
+        Each block is built as one NumPy buffer and written in a single call.
+
+        Args:
+            filename: Output filename
+            vertices: Array of vertices (N, 3)
+            faces: Array (M, K) or list of face indices (polygons allowed)
+        """
+        vertices = np.asarray(vertices)
+        if vertices.dtype == np.float32:
+            vertex_type, vertex_dtype = "float", "<f4"
+        else:
+            vertex_type, vertex_dtype = "double", "<f8"
+
+        face_bytes, face_count = self._face_buffer(faces)
+
+        header = (
+            "ply\n"
+            "format binary_little_endian 1.0\n"
+            "comment PLY file generated by 3D Model Viewer\n"
+            f"element vertex {len(vertices)}\n"
+            f"property {vertex_type} x\n"
+            f"property {vertex_type} y\n"
+            f"property {vertex_type} z\n"
+            f"element face {face_count}\n"
+            "property list uchar int vertex_indices\n"
+            "end_header\n"
+        )
+
+        with open(filename, 'wb') as file:
+            file.write(header.encode('ascii'))
+            np.ascontiguousarray(vertices, dtype=vertex_dtype).tofile(file)
+            face_bytes.tofile(file)
+
+    def _face_buffer(self, faces):
+        """Encode faces as PLY records (uchar count + int32 indices) in one uint8 array"""
+        if not isinstance(faces, np.ndarray) and len(faces) and len(set(map(len, faces))) == 1:
+            faces = np.array(faces, dtype=np.int64)
+        if isinstance(faces, np.ndarray) and faces.ndim == 2:
+            # Грани одного размера: структурированный массив без циклов Python
+            size = faces.shape[1]
+            records = np.empty(len(faces), dtype=[('count', 'u1'), ('indices', '<i4', (size,))])
+            records['count'] = size
+            records['indices'] = faces
+            return records.view(np.uint8), len(faces)
+
+        sizes = np.array([len(face) for face in faces], dtype=np.int64)
+        if np.any(sizes > 255):
+            raise ValueError("PLY faces are limited to 255 vertices")
+        indices = np.fromiter((index for face in faces for index in face), dtype='<i4', count=sizes.sum())
+
+        # Байт счетчика перед каждой гранью, затем 4 байта на индекс
+        starts = np.arange(len(sizes)) + 4 * np.concatenate(([0], np.cumsum(sizes)[:-1]))
+        buffer = np.empty(len(sizes) + 4 * len(indices), dtype=np.uint8)
+        is_count = np.zeros(len(buffer), dtype=bool)
+        is_count[starts] = True
+        buffer[starts] = sizes
+        buffer[~is_count] = indices.view(np.uint8)
+        return buffer, len(sizes)
@@ -0,0 +1,106 @@
+import time
+
+class PreviewScheduler:
+    """
+    Coalesces parameter change events into a limited number of redraws
+
+    Every change marks a key (e.g. "transform", "segments") as dirty.
+    Dirty keys are merged until the next preview frame, which is drawn at
+    most once per frame interval through root.after (throttling) and always
+    uses the latest parameter values, so intermediate values that arrived
+    while a frame was pending are dropped instead of drawn. The interval is
+    counted from the end of the previous frame, so slow frames lower the
+    rate instead of queueing up. When no change has arrived for settle_ms
+    (debouncing) one final full-resolution frame is drawn and any pending
+    preview frame is cancelled as stale. The quiet period is stretched to
+    at least twice the cost of a preview frame, so a slow preview does not
+    make every frame look like the end of a drag.
+    """
+
+    def __init__(self, root, render, fps=20, settle_ms=300):
+        """
+        Args:
+            root: Tk widget used for after/after_cancel
+            render: Callback render(keys, preview) drawing a frame for the set of dirty keys
+            fps: Target preview frame rate
+            settle_ms: Quiet period after which the final frame is drawn
+        """
+        self.root = root
+        self.render = render
+        self.frame_ms = max(1, int(1000 / fps))
+        self.settle_ms = settle_ms
+        self.pending = set()     # ключи, измененные после последнего кадра предпросмотра
+        self.unsettled = set()   # ключи, измененные после последнего полного кадра
+        self.requests = 0
+        self.preview_frames = 0
+        self.final_frames = 0
+        self._frame_job = None
+        self._final_job = None
+        self._last_frame = 0.0
+        self._frame_cost = 0.0
+
+    def request(self, key):
+        """Mark a parameter as changed and schedule the frames"""
+        self.requests += 1
+        self.pending.add(key)
+        self.unsettled.add(key)
+
+        if self._final_job is not None:
+            self.root.after_cancel(self._final_job)
+        settle_ms = max(self.settle_ms, int(2000 * self._frame_cost))
+        self._final_job = self.root.after(settle_ms, self._final)
+
+        if self._frame_job is None:
+            wait = self._last_frame + self.frame_ms / 1000 - time.perf_counter()
+            self._frame_job = self.root.after(max(0, int(wait * 1000)), self._frame)
+
+    def flush(self):
+        """Draw the final frame now if changes are waiting for it"""
+        if self._final_job is not None:
+            self.root.after_cancel(self._final_job)
+            self._final()
+
+    def cancel(self):
+        """Forget all pending changes without drawing"""
+        for job in (self._frame_job, self._final_job):
+            if job is not None:
+                self.root.after_cancel(job)
+        self._frame_job = None
+        self._final_job = None
+        self.pending = set()
+        self.unsettled = set()
+
+    @property
+    def dropped(self):
+        """Change events that were merged into another frame"""
+        return self.requests - self.preview_frames
+
+    def summary_text(self):
+        """One line with the event and frame counters for the profile panel"""
+        return (f"Живой просмотр: событий {self.requests}, кадров {self.preview_frames} "
+                f"+ {self.final_frames} полных, пропущено {self.dropped}")
+
+    def _frame(self):
+        self._frame_job = None
+        keys, self.pending = self.pending, set()
+        if not keys:
+            return
+        begin = time.perf_counter()
+        try:
+            self.render(keys, True)
+        finally:
+            self.preview_frames += 1
+            self._last_frame = time.perf_counter()
+            self._frame_cost = self._last_frame - begin
+
+    def _final(self):
+        self._final_job = None
+        if self._frame_job is not None:
+            # Кадр предпросмотра устарел: сразу рисуем полный
+            self.root.after_cancel(self._frame_job)
+            self._frame_job = None
+        self.pending = set()
+        keys, self.unsettled = self.unsettled, set()
+        if keys:
+            self.final_frames += 1
+            self.render(keys, False)
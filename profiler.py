@@ -0,0 +1,161 @@
+import cProfile
+import json
+import os
+import time
+import tracemalloc
+from contextlib import contextmanager
+from functools import wraps
+
+# MODEL_VIEWER_PROFILE=load_obj_file,translate_model (или "all") включает cProfile
+# и tracemalloc для перечисленных операций; результаты пишутся в
+# MODEL_VIEWER_PROFILE_DIR (по умолчанию текущий каталог)
+PROFILE_ENV_VAR = "MODEL_VIEWER_PROFILE"
+PROFILE_DIR_ENV_VAR = "MODEL_VIEWER_PROFILE_DIR"
+
+class Profiler:
+    """
+    Lightweight timers and counters for the hot paths of the viewer.
+
+    Operations are top level user actions (load a file, apply a transform).
+    Sections are timed calls inside them (parsing, generation, drawing);
+    each section also feeds cumulative per-name counters. The breakdown of
+    the last operation and a bounded trace of recent operations are kept.
+    """
+
+    def __init__(self, max_trace=200):
+        self.enabled = True
+        self.max_trace = max_trace
+        self.counters = {}          # имя -> {"calls", "total", "max"}
+        self.trace = []             # завершенные операции, старые первыми
+        self.last_operation = None
+        self._current = None
+        self._depth = 0
+
+    def reset(self):
+        self.counters = {}
+        self.trace = []
+        self.last_operation = None
+
+    def _profile_targets(self):
+        value = os.environ.get(PROFILE_ENV_VAR, "")
+        return {name.strip() for name in value.split(",") if name.strip()}
+
+    @contextmanager
+    def operation(self, name):
+        """Time a top level user action and collect the sections run inside it"""
+        if not self.enabled or self._current is not None:
+            # Вложенная операция считается обычной секцией
+            with self.section(name):
+                yield
+            return
+
+        targets = self._profile_targets()
+        capture = name in targets or "all" in targets
+        record = {"operation": name, "start": time.time(), "sections": [], "error": None}
+        self._current = record
+
+        profile = None
+        started_tracemalloc = False
+        if capture:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                started_tracemalloc = True
+            if hasattr(tracemalloc, "reset_peak"):
+                # Python 3.9+; раньше пик считается с запуска трассировки
+                tracemalloc.reset_peak()
+            profile = cProfile.Profile()
+            profile.enable()
+
+        begin = time.perf_counter()
+        try:
+            yield
+        except Exception as e:
+            record["error"] = str(e)
+            raise
+        finally:
+            record["total"] = time.perf_counter() - begin
+            if profile is not None:
+                profile.disable()
+                record["peak_memory"] = tracemalloc.get_traced_memory()[1]
+                if started_tracemalloc:
+                    tracemalloc.stop()
+                record["profile_file"] = self._save_profile(name, profile)
+            self._current = None
+            self.last_operation = record
+            self.trace.append(record)
+            del self.trace[:-self.max_trace]
+
+    @contextmanager
+    def section(self, name):
+        """Time a block and add it to the counters and the current operation"""
+        if not self.enabled:
+            yield
+            return
+
+        depth = self._depth
+        self._depth += 1
+        # Запись добавляется до выполнения, чтобы секции шли в порядке вызова
+        entry = {"name": name, "seconds": 0.0, "depth": depth}
+        if self._current is not None:
+            self._current["sections"].append(entry)
+
+        begin = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - begin
+            self._depth = depth
+            entry["seconds"] = elapsed
+
+            counter = self.counters.setdefault(name, {"calls": 0, "total": 0.0, "max": 0.0})
+            counter["calls"] += 1
+            counter["total"] += elapsed
+            counter["max"] = max(counter["max"], elapsed)
+
+    def timed(self, name):
+        """Decorator form of section()"""
+        def decorator(func):
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.section(name):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def _save_profile(self, name, profile):
+        directory = os.environ.get(PROFILE_DIR_ENV_VAR, ".")
+        filename = os.path.join(directory, f"{name}-{int(time.time() * 1000)}.prof")
+        try:
+            profile.dump_stats(filename)
+        except OSError:
+            return None
+        return filename
+
+    def breakdown_text(self, max_depth=1):
+        """Human readable breakdown of the last operation for the info panel"""
+        record = self.last_operation
+        if record is None:
+            return "Нет данных о времени"
+
+        lines = [f"{record['operation']}: {record['total'] * 1000:.1f} мс"]
+        # Два верхних уровня вложенности, с отступом по глубине
+        for section in record["sections"]:
+            if section["depth"] <= max_depth:
+                indent = "  " * (section["depth"] + 1)
+                lines.append(f"{indent}{section['name']}: {section['seconds'] * 1000:.1f} мс")
+        if "peak_memory" in record:
+            lines.append(f"  пик памяти: {record['peak_memory'] / 1024 / 1024:.1f} МБ")
+        return "\n".join(lines)
+
+    def dump_json(self, filename):
+        """Write counters and the operation trace to a JSON file"""
+        data = {"counters": self.counters, "operations": self.trace}
+        with open(filename, "w", encoding="utf-8") as file:
+            json.dump(data, file, ensure_ascii=False, indent=2)
+
+# Общий профилировщик для всех модулей программы
+profiler = Profiler()
+
+def timed(name):
+    """Decorator timing a function with the shared profiler"""
+    return profiler.timed(name)
@@ -1,10 +1,73 @@
 import numpy as np
 import math
+from profiler import timed
+from mesh_edges import unique_edges
+
+ROTATION_AXES = ('x', 'y', 'z')
+
+def rotation_table(segments):
+    """cos/sin of the segment angles i * 2pi / segments"""
+    angles = np.arange(segments) * (2 * math.pi / segments)
+    return np.cos(angles), np.sin(angles)
+
+def rotation_faces(segments, profile_len):
+    """
+    Triangles of a rotation surface with `segments` copies of a profile of
+    `profile_len` points; vertex i * profile_len + j is point j of segment i
+    """
+    i = np.arange(segments).reshape(-1, 1)
+    j = np.arange(profile_len - 1).reshape(1, -1)
+    next_i = (i + 1) % segments
+    idx1 = i * profile_len + j
+    idx2 = i * profile_len + j + 1
+    idx3 = next_i * profile_len + j + 1
+    idx4 = next_i * profile_len + j
+    
+    faces = np.empty((segments, profile_len - 1, 2, 3), dtype=np.int64)
+    faces[:, :, 0] = np.stack(np.broadcast_arrays(idx1, idx2, idx3), axis=-1)
+    faces[:, :, 1] = np.stack(np.broadcast_arrays(idx1, idx3, idx4), axis=-1)
+    return faces.reshape(-1, 3)
+
+def fill_rotation_columns(vertices, profile, axis, cos_table, sin_table, columns=None):
+    """
+    Write the rotated copies of profile points into vertices in place
+    
+    Args:
+        vertices: Array (segments * profile_len, 3) to update
+        profile: Array (profile_len, 2) of (x, y) points
+        columns: Indices of the profile points to update (all by default)
+    """
+    grid = vertices.reshape(len(cos_table), len(profile), 3)
+    if columns is None:
+        columns = slice(None)
+    x = profile[columns, 0]
+    y = profile[columns, 1]
+    x_cos = np.multiply.outer(cos_table, x)
+    x_sin = np.multiply.outer(sin_table, x)
+    y_cos = np.multiply.outer(cos_table, y)
+    y_sin = np.multiply.outer(sin_table, y)
+    
+    if axis == 'x':
+        # Rotate around X axis
+        grid[:, columns, 0] = x
+        grid[:, columns, 1] = y_cos
+        grid[:, columns, 2] = y_sin
+    elif axis == 'y':
+        # Rotate around Y axis (most common)
+        grid[:, columns, 0] = x_cos
+        grid[:, columns, 1] = y
+        grid[:, columns, 2] = x_sin
+    else:
+        # Rotate around Z axis
+        grid[:, columns, 0] = x_cos
+        grid[:, columns, 1] = x_sin
+        grid[:, columns, 2] = y
 
 class RotationSurface:
-    def __init__(self):
-        pass
+    def __init__(self, dtype=np.float64):
+        self.dtype = dtype
     
+    @timed("RotationSurface.create_rotation_surface")
     def create_rotation_surface(self, profile_points, axis='y', segments=16):
         """
         Create a rotation surface from profile points
@@ -14,50 +77,16 @@ class RotationSurface:
             axis: Axis of rotation ('x', 'y', or 'z')
             segments: Number of rotation segments
         """
-        vertices = []
-        faces = []
-        
-        angle_step = 2 * math.pi / segments
-        
-        # Generate vertices
-        for i in range(segments):
-            angle = i * angle_step
-            cos_angle = math.cos(angle)
-            sin_angle = math.sin(angle)
-            
-            for x, y in profile_points:
-                if axis == 'x':
-                    # Rotate around X axis
-                    vertex = [x, y * cos_angle, y * sin_angle]
-                elif axis == 'y':
-                    # Rotate around Y axis (most common)
-                    vertex = [x * cos_angle, y, x * sin_angle]
-                elif axis == 'z':
-                    # Rotate around Z axis
-                    vertex = [x * cos_angle, x * sin_angle, y]
-                else:
-                    raise ValueError("Axis must be 'x', 'y', or 'z'")
-                
-                vertices.append(vertex)
+        if axis not in ROTATION_AXES:
+            raise ValueError("Axis must be 'x', 'y', or 'z'")
         
-        # Generate faces (quads between segments)
-        profile_len = len(profile_points)
-        for i in range(segments):
-            for j in range(profile_len - 1):
-                # Current segment indices
-                idx1 = i * profile_len + j
-                idx2 = i * profile_len + j + 1
-                
-                # Next segment indices (wrap around)
-                next_i = (i + 1) % segments
-                idx3 = next_i * profile_len + j + 1
-                idx4 = next_i * profile_len + j
-                
-                # Create two triangles for the quad
-                faces.append([idx1, idx2, idx3])
-                faces.append([idx1, idx3, idx4])
+        profile = np.asarray(profile_points, dtype=np.float64).reshape(-1, 2)
+        cos_table, sin_table = rotation_table(segments)
+        vertices = np.empty((segments * len(profile), 3), dtype=self.dtype)
+        fill_rotation_columns(vertices, profile, axis, cos_table, sin_table)
         
-        return np.array(vertices), faces
+        # Faces (two triangles per quad between segments)
+        return vertices, rotation_faces(segments, len(profile)).tolist()
     
     def create_cylinder(self, radius=1, height=2, segments=16):
         """Create a cylinder using rotation surface"""
@@ -77,4 +106,68 @@ class RotationSurface:
             x = radius * math.sin(angle)
             y = radius * math.cos(angle)
             profile_points.append((x, y))
-        return self.create_rotation_surface(profile_points, 'y', segments)
\ No newline at end of file
+        return self.create_rotation_surface(profile_points, 'y', segments)
+
+class IncrementalRotationSurface:
+    """
+    Rotation surface generator that keeps its state between calls
+    
+    The cos/sin table, the face topology and the edge list are cached and
+    rebuilt only when the segment count or the number of profile points
+    changes. Editing profile points rewrites only their columns (one
+    vertex per segment), so interactive editing does not regenerate the
+    whole mesh.
+    
+    The returned arrays are owned by the generator and updated in place on
+    the next call; copy them before modifying.
+    """
+    
+    def __init__(self, dtype=np.float64):
+        self.dtype = dtype
+        self.profile = None
+        self.axis = None
+        self.segments = None
+        self.vertices = None
+        self.faces = None
+        self._cos = None
+        self._sin = None
+        self._edges = None
+    
+    @timed("IncrementalRotationSurface.update")
+    def update(self, profile_points, axis='y', segments=16):
+        """
+        Bring the surface up to date with the given parameters
+        
+        Returns:
+            vertices (segments * len(profile_points), 3), faces (M, 3) and
+            the indices of the profile points whose columns were rewritten
+        """
+        if axis not in ROTATION_AXES:
+            raise ValueError("Axis must be 'x', 'y', or 'z'")
+        profile = np.array(profile_points, dtype=np.float64).reshape(-1, 2)
+        
+        if segments != self.segments:
+            self._cos, self._sin = rotation_table(segments)
+        if segments != self.segments or self.profile is None or len(profile) != len(self.profile):
+            self.faces = rotation_faces(segments, len(profile))
+            self._edges = None
+            self.vertices = np.empty((segments * len(profile), 3), dtype=self.dtype)
+            columns = np.arange(len(profile))
+        elif axis != self.axis:
+            columns = np.arange(len(profile))
+        else:
+            columns = np.flatnonzero(np.any(profile != self.profile, axis=1))
+        
+        self.profile = profile
+        self.axis = axis
+        self.segments = segments
+        if len(columns):
+            fill_rotation_columns(self.vertices, profile, axis, self._cos, self._sin, columns)
+        return self.vertices, self.faces, columns
+    
+    @property
+    def edges(self):
+        """Unique edges (E, 2) of the current topology, cached until it changes"""
+        if self._edges is None:
+            self._edges = unique_edges(self.faces, len(self.vertices))
+        return self._edges
@@ -0,0 +1,385 @@
+import numpy as np
+from profiler import timed
+from mesh_analysis import similarity_scale
+
+# Не больше 2**20 ячеек по оси: ключ ячейки помещается в int64
+_MAX_CELLS_PER_AXIS = 2 ** 20
+
+# Примерное число пар (запрос, ячейка) за один проход поиска кандидатов
+_CHUNK_CELLS = 2 ** 20
+
+# Больше пар близких вершин find_duplicates не хранит, а перебирает заново
+_MAX_STORED_PAIRS = 2 ** 24
+
+class SpatialHash:
+    """
+    Uniform grid over a point set for nearest-vertex and radius queries
+
+    Points are quantized to integer cells and sorted by one int64 cell key,
+    so the points of a cell are a contiguous slice found with searchsorted.
+    Building is a single argsort and every query is batched over all query
+    points; a query block that would visit more cells than there are points
+    falls back to comparing against every point.
+
+    The index keeps its own frame. After rigid transforms and uniform
+    scales of the indexed points (translate, rotate, uniform scale) call
+    transform() instead of rebuilding: queries are mapped back into the
+    index frame and distances are scaled to the current one.
+    """
+
+    def __init__(self, vertices, cell_size=None):
+        """
+        Args:
+            vertices: Array (N, 3); copied into the index
+            cell_size: Grid cell edge; by default extent / sqrt(N), about a
+                       point per occupied cell for surface meshes
+        """
+        points = np.asarray(vertices, dtype=np.float64).reshape(-1, 3)
+        self.count = len(points)
+        self.matrix = np.eye(4)          # кадр индекса -> текущие координаты
+        self._inverse = np.eye(4)
+        self._scale = 1.0
+
+        low = points.min(axis=0) if self.count else np.zeros(3)
+        high = points.max(axis=0) if self.count else np.zeros(3)
+        extent = float((high - low).max())
+        if cell_size is None:
+            cell_size = 2 * extent / max(1.0, np.sqrt(self.count))
+        elif cell_size <= 0:
+            raise ValueError("cell_size must be positive")
+        self.cell_size = max(float(cell_size), extent / _MAX_CELLS_PER_AXIS, 1e-300)
+        self.origin = low
+        self.dims = np.floor((high - low) / self.cell_size).astype(np.int64) + 1
+
+        self._build(points)
+
+    @timed("SpatialHash.build")
+    def _build(self, points):
+        keys = self._keys(self._cells(points))
+        self.order = np.argsort(keys, kind='stable')
+        self.keys = keys[self.order]
+        self.points = points[self.order]
+
+    def _cells(self, points):
+        return np.floor((points - self.origin) / self.cell_size).astype(np.int64)
+
+    def _keys(self, cells):
+        return (cells[..., 0] * self.dims[1] + cells[..., 1]) * self.dims[2] + cells[..., 2]
+
+    # ------------------------------------------------------------------
+    # Transforms
+    # ------------------------------------------------------------------
+
+    def transform(self, matrix):
+        """
+        Follow a 4x4 transform already applied to the indexed points
+
+        Raises:
+            ValueError: The transform is not rigid or a uniform scale;
+                        such a transform needs a new index
+        """
+        matrix = np.asarray(matrix, dtype=np.float64)
+        scale = similarity_scale(matrix[:3, :3])
+        if scale is None:
+            raise ValueError("SpatialHash follows only rigid transforms and uniform scales")
+        self.matrix = matrix @ self.matrix
+        self._inverse = np.linalg.inv(self.matrix)
+        self._scale *= scale
+
+    def _to_index(self, points):
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+        return points @ self._inverse[:3, :3].T + self._inverse[:3, 3]
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def _candidate_chunks(self, queries, reach, query_ids=None):
+        """
+        Points in the (2 * reach + 1)^3 block of cells around each query
+
+        Pairs are produced in chunks of about _CHUNK_CELLS cells (or query,
+        point pairs once the block is larger than the point cloud), so the
+        caller can filter them before the next chunk is built.
+
+        Args:
+            queries: Points (Q, 3) in the index frame
+            reach: Block half-size in cells
+            query_ids: Ids reported for the queries (default 0..Q-1)
+
+        Yields:
+            query ids and positions in the sorted points of candidate pairs
+        """
+        if query_ids is None:
+            query_ids = np.arange(len(queries))
+        if 2 * reach + 1 >= np.cbrt(self.count):
+            # Блок больше облака точек: сравниваем со всеми точками
+            chunk = max(1, _CHUNK_CELLS // max(self.count, 1))
+            for begin in range(0, len(queries), chunk):
+                ids = query_ids[begin:begin + chunk]
+                yield np.repeat(ids, self.count), np.tile(np.arange(self.count), len(ids))
+            return
+
+        steps = np.arange(-reach, reach + 1)
+        offsets = np.stack(np.meshgrid(steps, steps, steps, indexing='ij'), axis=-1).reshape(-1, 3)
+        chunk = max(1, _CHUNK_CELLS // len(offsets))
+        for begin in range(0, len(queries), chunk):
+            cells = self._cells(queries[begin:begin + chunk])[:, None, :] + offsets      # (q, B, 3)
+            inside = np.all((cells >= 0) & (cells < self.dims), axis=-1)
+            keys = self._keys(cells)
+            starts = np.searchsorted(self.keys, keys, side='left').reshape(-1)
+            counts = np.where(inside, np.searchsorted(self.keys, keys, side='right'), 0).reshape(-1)
+            counts = np.maximum(counts - starts, 0)
+
+            # Разворачиваем диапазоны [start, end) ячеек в плоский список позиций
+            runs = np.repeat(np.arange(len(counts)), counts)
+            run_starts = np.cumsum(counts) - counts
+            yield (query_ids[begin + runs // len(offsets)],
+                   starts[runs] + (np.arange(len(runs)) - run_starts[runs]))
+
+    def _candidates(self, queries, reach, query_ids=None):
+        """All candidate pairs of _candidate_chunks() as two arrays"""
+        chunks = list(self._candidate_chunks(queries, reach, query_ids))
+        if not chunks:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        return (np.concatenate([owners for owners, _ in chunks]),
+                np.concatenate([positions for _, positions in chunks]))
+
+    def _close_pairs(self, queries, radius, query_ids=None):
+        """Candidate pairs within radius, filtered chunk by chunk: (owners, positions, distances)"""
+        reach = max(1, int(np.ceil(radius / self.cell_size)))
+        for owners, positions in self._candidate_chunks(queries, reach, query_ids):
+            distances = np.linalg.norm(self.points[positions] - queries[owners], axis=1)
+            keep = distances <= radius
+            yield owners[keep], positions[keep], distances[keep]
+
+    @timed("SpatialHash.query_radius")
+    def query_radius(self, points, radius, return_distances=False):
+        """
+        Indexed vertices within radius of each query point
+
+        Args:
+            points: Array (Q, 3) in current coordinates
+            radius: Search radius in current coordinates
+            return_distances: Also return the distances
+
+        Returns:
+            List of Q vertex index arrays, nearest first (and the matching
+            list of distance arrays if return_distances)
+        """
+        queries = self._to_index(points)
+        if len(queries) == 0:
+            return ([], []) if return_distances else []
+        owners, positions, distances = [], [], []
+        for chunk_owners, chunk_positions, chunk_distances in self._close_pairs(queries, radius / self._scale):
+            # Части идут по возрастанию запросов: сортировка внутри части достаточна
+            order = np.lexsort((chunk_distances, chunk_owners))
+            owners.append(chunk_owners[order])
+            positions.append(chunk_positions[order])
+            distances.append(chunk_distances[order])
+        owners, positions, distances = (np.concatenate(values) for values in (owners, positions, distances))
+        splits = np.searchsorted(owners, np.arange(1, len(queries)))
+        indices = np.split(self.order[positions], splits)
+        if return_distances:
+            return indices, np.split(distances * self._scale, splits)
+        return indices
+
+    @timed("SpatialHash.query_knn")
+    def query_knn(self, points, k=1):
+        """
+        k nearest indexed vertices of each query point (exact)
+
+        The cell block of an unfinished query grows (to the k-th candidate
+        distance, or doubles without k candidates) until the k-th candidate
+        is within the distance the block is known to cover.
+
+        Returns:
+            distances (Q, k) and vertex indices (Q, k), nearest first;
+            missing neighbours (fewer than k vertices) are inf and -1
+        """
+        queries = self._to_index(points)
+        distances = np.full((len(queries), k), np.inf)
+        indices = np.full((len(queries), k), -1, dtype=np.int64)
+        if self.count == 0:
+            return distances, indices
+
+        # Запросы вне сетки начинают с блока, доходящего до ее границы
+        high = self.origin + self.dims * self.cell_size
+        outside = np.linalg.norm(np.maximum(np.maximum(self.origin - queries, queries - high), 0), axis=1)
+        reaches = np.ceil(np.clip(outside / self.cell_size, 1, 2 ** 40)).astype(np.int64)
+
+        pending = np.arange(len(queries))
+        while len(pending):
+            brute = 2 * reaches[pending] + 1 >= np.cbrt(self.count)
+            if brute.any():
+                # Блок больше облака точек: полный перебор
+                self._knn_all(queries, pending[brute], k, distances, indices)
+                pending = pending[~brute]
+
+            candidates = [self._candidates(queries[group], reach, group)
+                          for reach in np.unique(reaches[pending])
+                          for group in [pending[reaches[pending] == reach]]]
+            if not candidates:
+                break
+            owners = np.concatenate([owner for owner, _ in candidates])
+            positions = np.concatenate([position for _, position in candidates])
+            found = np.linalg.norm(self.points[positions] - queries[owners], axis=1)
+
+            selected, rank = _nearest_per_run(owners, found, k)
+            owners, positions, found = owners[selected], positions[selected], found[selected]
+
+            # Блок гарантированно содержит все точки ближе reach * cell_size
+            kth = np.full(len(queries), np.inf)
+            last = rank == k - 1
+            kth[owners[last]] = found[last]
+            done = kth[pending] <= reaches[pending] * self.cell_size
+            finished = np.zeros(len(queries), dtype=bool)
+            finished[pending[done]] = True
+            finished = finished[owners]
+            distances[owners[finished], rank[finished]] = found[finished] * self._scale
+            indices[owners[finished], rank[finished]] = self.order[positions[finished]]
+
+            # Найденное k-е расстояние сразу дает достаточный размер блока
+            pending = pending[~done]
+            needed = np.ceil(np.minimum(kth[pending] / self.cell_size, 2 ** 40)).astype(np.int64)
+            reaches[pending] = np.where(np.isfinite(kth[pending]), needed, 2 * reaches[pending])
+        return distances, indices
+
+    def _knn_all(self, queries, pending, k, distances, indices):
+        """k nearest of the pending queries by distances to every point, in chunks"""
+        count = min(k, self.count)
+        chunk = max(1, _CHUNK_CELLS // self.count)
+        for begin in range(0, len(pending), chunk):
+            ids = pending[begin:begin + chunk]
+            found = np.linalg.norm(self.points[None, :, :] - queries[ids, None, :], axis=2)
+            nearest = np.argpartition(found, count - 1, axis=1)[:, :count] if count < self.count \
+                else np.broadcast_to(np.arange(self.count), (len(ids), self.count))
+            nearest = np.take_along_axis(nearest, np.argsort(np.take_along_axis(found, nearest, 1), axis=1), 1)
+            distances[ids, :count] = np.take_along_axis(found, nearest, 1) * self._scale
+            indices[ids, :count] = self.order[nearest]
+
+    def nearest(self, points):
+        """Index (Q,) and distance (Q,) of the nearest indexed vertex of each query point"""
+        distances, indices = self.query_knn(points, 1)
+        return indices[:, 0], distances[:, 0]
+
+    # ------------------------------------------------------------------
+    # Duplicates
+    # ------------------------------------------------------------------
+
+    @timed("SpatialHash.find_duplicates")
+    def find_duplicates(self, tolerance=1e-9):
+        """
+        Group vertices within tolerance of each other (transitively)
+
+        Returns:
+            Array (N,) with the smallest vertex index of each vertex's group;
+            vertices without duplicates map to themselves
+        """
+        local_tolerance = tolerance / self._scale
+        grid = self
+        if self.cell_size > 4 * local_tolerance:
+            # Мелкая сетка: в ячейке почти всегда не больше одной точки
+            grid = SpatialHash(self.points, max(local_tolerance, 1e-300))
+        # Позиции в сетке -> исходные номера вершин
+        to_vertex = self.order if grid is self else self.order[grid.order]
+
+        def pairs():
+            for owners, positions, _ in grid._close_pairs(grid.points, local_tolerance):
+                first, second = to_vertex[owners], to_vertex[positions]
+                distinct = first < second
+                yield first[distinct], second[distinct]
+
+        # Пары держим в памяти, пока их немного; иначе проходим по частям повторно
+        stored, total = [], 0
+        for pair in pairs():
+            total += len(pair[0])
+            if total > _MAX_STORED_PAIRS:
+                stored = None
+                break
+            stored.append(pair)
+
+        # Минимальный номер распространяется по парам до стабилизации
+        labels = np.arange(self.count)
+        while True:
+            previous = labels
+            for first, second in (stored if stored is not None else pairs()):
+                labels = _merge_labels(labels, first, second)
+            if np.array_equal(labels, previous):
+                return labels
+
+    def weld(self, vertices, faces, tolerance=1e-9):
+        """
+        Merge vertices within tolerance of each other
+
+        Args:
+            vertices: Current vertices (N, 3) of the indexed mesh
+            faces: Array (M, K) or list of face indices
+            tolerance: Merge distance in current coordinates
+
+        Returns:
+            vertices (N', 3), faces renumbered to them (faces left with
+            repeated vertices are dropped) and the old -> new index map (N,)
+        """
+        labels = self.find_duplicates(tolerance)
+        keep = labels == np.arange(self.count)
+        mapping = (np.cumsum(keep) - 1)[labels]
+        welded = np.asarray(vertices)[keep]
+
+        if isinstance(faces, np.ndarray) and faces.ndim == 2:
+            remapped = mapping[faces]
+            ordered = np.sort(remapped, axis=1)
+            distinct = np.all(ordered[:, 1:] != ordered[:, :-1], axis=1)
+            return welded, remapped[distinct], mapping
+
+        remapped = []
+        for face in faces:
+            face = [int(mapping[index]) for index in face]
+            if len(face) >= 3 and len(set(face)) == len(face):
+                remapped.append(face)
+        return welded, remapped, mapping
+
+def _nearest_per_run(owners, found, k):
+    """
+    Up to k smallest distances of every run of equal owners
+
+    Candidates of one query are contiguous, so the runs are padded into a
+    (runs, longest run) table and partitioned row-wise instead of sorted.
+
+    Returns:
+        Indices of the selected candidates and their rank within the run
+    """
+    starts = np.flatnonzero(np.concatenate((owners[:1] == owners[:1], owners[1:] != owners[:-1])))
+    lengths = np.diff(np.append(starts, len(owners)))
+    if len(starts) == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    runs = np.repeat(np.arange(len(starts)), lengths)
+    columns = np.arange(len(owners)) - starts[runs]
+
+    width = int(lengths.max())
+    table = np.full((len(starts), width), np.inf)
+    table[runs, columns] = found
+    count = min(k, width)
+    if count < width:
+        nearest = np.argpartition(table, count - 1, axis=1)[:, :count]
+    else:
+        nearest = np.broadcast_to(np.arange(width), (len(starts), width))
+    nearest = np.take_along_axis(nearest, np.argsort(np.take_along_axis(table, nearest, 1), axis=1), 1)
+
+    # Отбрасываем заполнители коротких серий
+    rank = np.broadcast_to(np.arange(count), nearest.shape)
+    valid = nearest < lengths[:, None]
+    return (starts[:, None] + nearest)[valid], rank[valid]
+
+def _merge_labels(labels, first, second):
+    """One propagation step of the smaller label over the pairs, then pointer jumping"""
+    labels = labels.copy()
+    low = np.minimum(labels[first], labels[second])
+    np.minimum.at(labels, first, low)
+    np.minimum.at(labels, second, low)
+    while True:
+        jumped = labels[labels]
+        if np.array_equal(jumped, labels):
+            return labels
+        labels = jumped
+
@@ -0,0 +1,45 @@
+import numpy as np
+from profiler import timed
+from mesh_edges import triangulate_faces
+
+# Запись треугольника бинарного STL: нормаль, три вершины, атрибут (50 байт)
+STL_TRIANGLE = np.dtype([
+    ('normal', '<f4', (3,)),
+    ('vertices', '<f4', (3, 3)),
+    ('attribute', '<u2'),
+])
+
+class STLWriter:
+    def __init__(self):
+        pass
+
+    @timed("STLWriter.write_stl")
+    def write_stl(self, filename, vertices, faces):
+        """
+        Write vertices and faces to a binary STL file
+
+        STL stores float32 coordinates per triangle (vertices are not shared);
+        polygons are fan-triangulated and facet normals are computed.
+        All triangles are written with a single tofile call.
+
+        Args:
+            filename: Output filename
+            vertices: Array of vertices (N, 3)
+            faces: Array (M, K) or list of face indices
+        """
+        vertices = np.asarray(vertices, dtype=np.float64)
+        triangles = vertices[triangulate_faces(faces)]
+
+        normals = np.cross(triangles[:, 1] - triangles[:, 0], triangles[:, 2] - triangles[:, 0])
+        lengths = np.linalg.norm(normals, axis=1, keepdims=True)
+        np.divide(normals, lengths, out=normals, where=lengths > 0)
+
+        records = np.zeros(len(triangles), dtype=STL_TRIANGLE)
+        records['normal'] = normals
+        records['vertices'] = triangles
+
+        header = b"Binary STL generated by 3D Model Viewer".ljust(80, b' ')
+        with open(filename, 'wb') as file:
+            file.write(header)
+            file.write(np.array([len(records)], dtype='<u4').tobytes())
+            records.tofile(file)
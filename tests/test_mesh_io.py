@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+
+from function_surface import FunctionSurface
+from model_loader import PLYLoader, STLLoader
+from ply_writer import PLYWriter
+from rotation_surface import RotationSurface
+from stl_writer import STLWriter
+
+def generated_meshes(dtype):
+    profile = [(0, -1), (0.8, -0.5), (1, 0), (0.8, 0.5), (0, 1)]
+    yield RotationSurface(dtype).create_rotation_surface(profile, 'y', 12)
+    yield FunctionSurface(dtype).create_function_surface("np.sin(x) * np.cos(y)", (-3, 3), (-2, 2), 9)
+
+@pytest.mark.parametrize("dtype", [np.float32, np.float64])
+def test_ply_round_trip_is_exact(tmp_path, dtype):
+    filename = str(tmp_path / "mesh.ply")
+    for vertices, faces in generated_meshes(dtype):
+        PLYWriter().write_ply(filename, vertices, faces)
+        loaded_vertices, loaded_faces = PLYLoader(dtype).load_ply(filename)
+
+        assert loaded_vertices.dtype == dtype
+        np.testing.assert_array_equal(loaded_vertices, vertices)
+        np.testing.assert_array_equal(loaded_faces, faces)
+
+def test_ply_round_trip_keeps_mixed_polygons(tmp_path):
+    filename = str(tmp_path / "mixed.ply")
+    vertices = np.random.default_rng(0).random((6, 3))
+    faces = [[0, 1, 2], [0, 2, 3, 4], [1, 2, 5, 4, 3]]
+    PLYWriter().write_ply(filename, vertices, faces)
+
+    loaded_vertices, loaded_faces = PLYLoader().load_ply(filename)
+    np.testing.assert_array_equal(loaded_vertices, vertices)
+    assert loaded_faces == faces
+
+def test_stl_round_trip_keeps_triangles_in_float32(tmp_path):
+    filename = str(tmp_path / "mesh.stl")
+    for vertices, faces in generated_meshes(np.float64):
+        STLWriter().write_stl(filename, vertices, faces)
+        loaded_vertices, loaded_faces = STLLoader().load_stl(filename)
+
+        # STL хранит float32 и не разделяет вершины: сравниваются углы треугольников
+        expected = np.asarray(vertices)[np.asarray(faces)].astype(np.float32)
+        np.testing.assert_array_equal(loaded_vertices[loaded_faces], expected)
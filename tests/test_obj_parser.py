@@ -0,0 +1,93 @@
+import numpy as np
+import pytest
+
+from model_loader import OBJLoader
+import parallel_loader
+from parallel_loader import ParallelOBJLoader
+
+# Одна некорректная вершина и одна некорректная нормаль среди правильных строк
+MALFORMED_OBJ = b"""v 0 0 0
+v 1 0 0
+v 0 1 abc
+v 0 1 0
+vn 0 0 1
+vn 0 0 x
+f 1 2 3
+"""
+
+def write_obj(tmp_path, content=MALFORMED_OBJ):
+    filename = tmp_path / "malformed.obj"
+    filename.write_bytes(content)
+    return str(filename)
+
+def test_lenient_parse_skips_malformed_vertex_and_normal(tmp_path):
+    vertices, faces, texture_coords, normals = OBJLoader().load_obj_advanced(write_obj(tmp_path))
+
+    np.testing.assert_array_equal(vertices, [[0, 0, 0], [1, 0, 0], [0, 1, 0]])
+    np.testing.assert_array_equal(faces, [[0, 1, 2]])
+    np.testing.assert_array_equal(normals, [[0, 0, 1]])
+
+def test_parallel_workers_skip_malformed_vertex(tmp_path):
+    loader = ParallelOBJLoader(workers=2, min_parallel_bytes=0)
+    data = loader.load(write_obj(tmp_path))
+
+    np.testing.assert_array_equal(data.vertices, [[0, 0, 0], [1, 0, 0], [0, 1, 0]])
+    np.testing.assert_array_equal(data.faces, [[0, 1, 2]])
+
+def test_load_groups_rejects_malformed_vertex(tmp_path):
+    loader = OBJLoader()
+    index = loader.build_index(write_obj(tmp_path, MALFORMED_OBJ + b"o second\nf 1 2 4\n"))
+
+    with pytest.raises(ValueError, match="malformed vertex"):
+        loader.load_groups(index, index.groups)
+
+def test_strict_loaders_skip_short_lines(tmp_path):
+    filename = write_obj(tmp_path, b"v 0 0 0\nv 1 0\nv 1 0 0\nv 0 1 0\nf 1 2\nf 1 2 3\n")
+
+    vertices, faces = OBJLoader().load_obj(filename)
+    np.testing.assert_array_equal(vertices, [[0, 0, 0], [1, 0, 0], [0, 1, 0]])
+    assert faces == [[0, 1, 2]]
+    vertices, faces = OBJLoader().load_simple_obj(filename)
+    assert faces == [[0, 1, 2]]
+
+def test_parallel_loader_reports_groups_across_chunks(tmp_path):
+    lines = [b"mtllib scene.mtl"]
+    for name in (b"first", b"second", b"third"):
+        lines += [b"o " + name, b"usemtl " + name]
+        lines += [b"v %d %d 0" % (i, i % 7) for i in range(200)]
+        lines += [b"f -1 -2 -3"] * 150
+    filename = write_obj(tmp_path, b"\n".join(lines) + b"\n")
+
+    expected = OBJLoader().parse(filename, triangulate=True)
+    data = ParallelOBJLoader(workers=4, min_parallel_bytes=0).load(filename)
+
+    assert [group.key for group in data.groups] == [group.key for group in expected.groups]
+    assert [group.face_ranges for group in data.groups] == [group.face_ranges for group in expected.groups]
+    np.testing.assert_array_equal(data.faces, expected.faces)
+    assert data.material_libraries == ["scene.mtl"]
+
+def test_parallel_index_matches_serial_scan(tmp_path):
+    lines = [b"mtllib scene.mtl"]
+    for name in (b"first", b"second", b"third"):
+        # Блоки вершин длиннее части файла продолжаются в следующей части
+        lines += [b"o " + name, b"# vertices"]
+        lines += [b"v %d %d 0" % (i, i % 7) for i in range(300)]
+        lines += [b"usemtl " + name] + [b"f -1 -2 -3"] * 20
+    filename = write_obj(tmp_path, b"\n".join(lines) + b"\n")
+
+    expected = OBJLoader().build_index(filename)
+    index = ParallelOBJLoader(workers=8, min_parallel_bytes=0).build_index(filename)
+
+    assert [(group.key, group.face_ranges, group.byte_ranges) for group in index.groups] == \
+        [(group.key, group.face_ranges, group.byte_ranges) for group in expected.groups]
+    assert index.vertex_blocks == expected.vertex_blocks
+    assert (index.vertex_count, index.face_count) == (expected.vertex_count, expected.face_count)
+    data = OBJLoader().load_groups(index, index.groups[1:2])
+    np.testing.assert_array_equal(data.vertices[data.faces], [[[299, 5, 0], [298, 4, 0], [297, 3, 0]]] * 20)
+
+def test_parallel_loader_without_shared_memory_parses_serially(tmp_path, monkeypatch):
+    monkeypatch.setattr(parallel_loader, "shared_memory", None)
+    filename = write_obj(tmp_path)
+
+    data = ParallelOBJLoader(workers=2, min_parallel_bytes=0).load(filename)
+    np.testing.assert_array_equal(data.vertices, OBJLoader().parse(filename).vertices)
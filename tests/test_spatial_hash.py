@@ -0,0 +1,28 @@
+import numpy as np
+
+import spatial_hash
+from spatial_hash import SpatialHash
+
+def test_query_radius_without_queries():
+    index = SpatialHash(np.random.default_rng(0).random((100, 3)))
+
+    assert index.query_radius(np.empty((0, 3)), 0.5) == []
+    assert index.query_radius(np.empty((0, 3)), 0.5, return_distances=True) == ([], [])
+
+def test_large_radius_matches_brute_force():
+    rng = np.random.default_rng(1)
+    points = rng.random((2000, 3))
+    queries = rng.random((40, 3))
+    # Радиус больше облака: ветка полного перебора, разбитая на части
+    result = SpatialHash(points).query_radius(queries, 0.5)
+
+    distances = np.linalg.norm(queries[:, None] - points[None], axis=2)
+    for found, row in zip(result, distances):
+        assert sorted(found) == list(np.flatnonzero(row <= 0.5))
+
+def test_find_duplicates_streams_pairs_over_the_limit(monkeypatch):
+    points = np.random.default_rng(2).random((1500, 3))
+    expected = SpatialHash(points).find_duplicates(0.04)
+
+    monkeypatch.setattr(spatial_hash, "_MAX_STORED_PAIRS", 10)
+    np.testing.assert_array_equal(SpatialHash(points).find_duplicates(0.04), expected)
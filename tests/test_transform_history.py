@@ -0,0 +1,33 @@
+import numpy as np
+
+from affine_transformations import AffineTransform
+from transform_history import TransformHistory
+
+def test_base_snapshot_larger_than_budget_keeps_undo_steps():
+    vertices = np.random.default_rng(0).random((1000, 3))
+    # Бюджет меньше одного снимка: шаги хранятся матрицами
+    history = TransformHistory(max_steps=100, checkpoint_interval=2, max_bytes=vertices.nbytes // 2)
+    history.reset(vertices)
+
+    transformer = AffineTransform()
+    current = vertices.copy()
+    for step in range(5):
+        matrix = transformer.translation_matrix(step, 0, 0)
+        current = transformer.apply_matrix(current, matrix)
+        history.push("Перемещение", matrix, current)
+
+    assert history.position == 5
+    assert history.budget_usage() <= history.max_bytes
+    for _ in range(5):
+        history.undo()
+    np.testing.assert_allclose(history.state(0), vertices)
+    np.testing.assert_array_equal(history.original, vertices)
+
+def test_absolute_step_over_budget_keeps_one_undo_step():
+    vertices = np.zeros((1000, 3))
+    history = TransformHistory(max_bytes=vertices.nbytes // 2)
+    history.reset(vertices)
+    history.push("Сброс", None, vertices + 1)
+
+    assert history.can_undo()
+    np.testing.assert_array_equal(history.undo(), vertices)
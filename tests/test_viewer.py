@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+
+tk = pytest.importorskip("tkinter")
+import main
+
+@pytest.fixture
+def viewer(monkeypatch):
+    try:
+        root = tk.Tk()
+    except tk.TclError:
+        pytest.skip("Tk needs a display")
+    root.withdraw()
+    errors = []
+    monkeypatch.setattr(main.messagebox, "showinfo", lambda *args, **kwargs: None)
+    monkeypatch.setattr(main.messagebox, "showerror", lambda *args, **kwargs: errors.append(args))
+    viewer = main.ModelViewer3D(root)
+    viewer.errors = errors
+    yield viewer
+    root.destroy()
+
+def set_entry(entry, text):
+    entry.delete(0, tk.END)
+    entry.insert(0, text)
+
+def test_profile_edit_after_weld_rebuilds_surface(viewer):
+    viewer.create_rotation_surface()
+    assert len(viewer.current_vertices) == 64
+    set_entry(viewer.weld_tolerance, "1e-6")
+    viewer.weld_vertices()
+    assert len(viewer.current_vertices) == 34
+
+    # Правка образующей строит сетку генератора заново, а не пишет в сваренную модель
+    set_entry(viewer.profile_entry, "0,0 2,0 1,1 0,1")
+    viewer.preview.request("rotation")
+    viewer.preview.flush()
+
+    assert viewer.errors == []
+    assert len(viewer.current_vertices) == 64
+    assert viewer.current_vertices[:, 0].max() == pytest.approx(2)
+
+SCENE_OBJ = """o first
+v 0 0 0
+v 1 0 0
+v 0 1 0
+f 1 2 3
+o second
+v 0 0 1
+v 1 0 1
+v 0 1 1
+f 4 5 6
+"""
+
+def test_show_all_groups_after_transform_returns_file_geometry(viewer, tmp_path, monkeypatch):
+    filename = tmp_path / "scene.obj"
+    filename.write_text(SCENE_OBJ)
+    # Сцена открывается лениво: сначала только первая группа
+    monkeypatch.setattr(main, "LAZY_LOAD_BYTES", 0)
+    viewer.load_obj_file(str(filename))
+    assert len(viewer.current_vertices) == 3
+
+    set_entry(viewer.trans_x, "100")
+    viewer.translate_model()
+    viewer.show_all_groups()
+
+    assert viewer.errors == []
+    np.testing.assert_array_equal(viewer.current_vertices,
+                                  [[0, 0, 0], [1, 0, 0], [0, 1, 0], [0, 0, 1], [1, 0, 1], [0, 1, 1]])
+    viewer.reset_transformations()
+    assert viewer.current_vertices[:, 0].max() == 1
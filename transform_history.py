@@ -0,0 +1,146 @@
+import numpy as np
+from affine_transformations import AffineTransform
+
+# Оценка памяти на одну запись истории: матрица 4x4 float64 плюс накладные расходы
+_ENTRY_BYTES = 4 * 4 * 8 + 64
+
+class TransformHistory:
+    """
+    Bounded undo/redo history of affine edits of one mesh.
+
+    Every step is stored as a 4x4 matrix instead of a full vertex copy.
+    Full snapshots are kept only for the base state, every
+    `checkpoint_interval` steps and for absolute steps (such as a reset).
+    Any state is rebuilt from the nearest earlier checkpoint by composing
+    the matrices in between. When the history exceeds `max_steps` or
+    `max_bytes`, the oldest steps are folded into the base state.
+
+    `max_bytes` bounds only what can be dropped: the base snapshot and the
+    original vertices are always kept, and so is at least one undo step.
+    Periodic checkpoints that do not fit the budget are skipped, so large
+    meshes keep their undo steps as matrices.
+    """
+
+    def __init__(self, max_steps=100, checkpoint_interval=10, max_bytes=64 * 1024 * 1024):
+        self.max_steps = max_steps
+        self.checkpoint_interval = checkpoint_interval
+        self.max_bytes = max_bytes
+        self.transformer = AffineTransform()
+        self.clear()
+
+    def clear(self):
+        """Forget everything, including the base state"""
+        self.entries = []       # (label, matrix or None)
+        self.checkpoints = {}   # индекс состояния -> снимок вершин
+        self.position = 0       # сколько шагов применено к базовому состоянию
+        self.original = None    # вершины до первого шага (для сброса)
+
+    def reset(self, vertices):
+        """Start a new history with vertices as the base state"""
+        self.clear()
+        # Исходные вершины и базовый снимок - один массив, пока база не сдвинется
+        self.original = np.array(vertices, copy=True)
+        self.checkpoints[0] = self.original
+
+    def push(self, label, matrix=None, vertices=None):
+        """
+        Record a step that has just been applied
+
+        Args:
+            label: Human readable name of the operation
+            matrix: 4x4 matrix of the step, or None for an absolute step
+            vertices: Vertices after the step; required for absolute steps,
+                      used to store a checkpoint otherwise
+        """
+        if 0 not in self.checkpoints:
+            raise ValueError("History has no base state, call reset() first")
+        if matrix is None and vertices is None:
+            raise ValueError("Absolute steps need the resulting vertices")
+
+        # Новая ветка отменяет все шаги для повтора
+        del self.entries[self.position:]
+        for index in [i for i in self.checkpoints if i > self.position]:
+            del self.checkpoints[index]
+
+        self.entries.append((label, None if matrix is None else np.array(matrix, dtype=np.float64)))
+        self.position += 1
+
+        if vertices is not None and (matrix is None or (
+                self.position % self.checkpoint_interval == 0
+                and self.budget_usage() + vertices.nbytes <= self.max_bytes)):
+            self.checkpoints[self.position] = np.array(vertices, copy=True)
+
+        self._enforce_limits()
+
+    def can_undo(self):
+        return self.position > 0
+
+    def can_redo(self):
+        return self.position < len(self.entries)
+
+    def undo(self):
+        """Step back and return a fresh copy of the resulting vertices"""
+        if not self.can_undo():
+            return None
+        self.position -= 1
+        return self.state(self.position)
+
+    def redo(self):
+        """Step forward and return a fresh copy of the resulting vertices"""
+        if not self.can_redo():
+            return None
+        self.position += 1
+        return self.state(self.position)
+
+    def undo_label(self):
+        return self.entries[self.position - 1][0] if self.can_undo() else None
+
+    def redo_label(self):
+        return self.entries[self.position][0] if self.can_redo() else None
+
+    def state(self, index):
+        """Rebuild the vertices after `index` steps as a new array"""
+        start = max(i for i in self.checkpoints if i <= index)
+
+        # Композиция матриц от контрольной точки до нужного шага
+        combined = np.eye(4)
+        for label, matrix in self.entries[start:index]:
+            combined = matrix @ combined
+
+        snapshot = self.checkpoints[start]
+        if start == index:
+            return snapshot.copy()
+        return self.transformer.apply_matrix(snapshot, combined)
+
+    def memory_usage(self):
+        """Approximate number of bytes held by the history"""
+        usage = self.budget_usage()
+        if 0 in self.checkpoints:
+            usage += self.checkpoints[0].nbytes
+        if self.original is not None and self.original is not self.checkpoints.get(0):
+            usage += self.original.nbytes
+        return usage
+
+    def budget_usage(self):
+        """Bytes counted against max_bytes: snapshots after the base and the steps"""
+        snapshots = sum(snapshot.nbytes for index, snapshot in self.checkpoints.items() if index > 0)
+        return snapshots + len(self.entries) * _ENTRY_BYTES
+
+    def _enforce_limits(self):
+        while self.position > 0 and len(self.entries) > self.max_steps:
+            self._fold_oldest()
+        # По памяти последний шаг отмены не сворачивается
+        while self.position > 1 and self.budget_usage() > self.max_bytes:
+            self._fold_oldest()
+
+    def _fold_oldest(self):
+        """Merge the oldest step into the base state"""
+        if 1 in self.checkpoints:
+            base = self.checkpoints.pop(1)
+        else:
+            base = self.transformer.apply_matrix(self.checkpoints[0], self.entries[0][1])
+        del self.entries[0]
+        del self.checkpoints[0]
+        self.checkpoints = {index - 1: snapshot for index, snapshot in self.checkpoints.items()}
+        self.checkpoints[0] = base
+        self.position -= 1
@@ -0,0 +1,80 @@
+import numpy as np
+from mpl_toolkits.mplot3d.art3d import Line3DCollection
+from profiler import profiler
+
+def set_axes_limits(ax, bounds):
+    """Cubic axes limits around the (min, max) bounds with padding"""
+    min_coords, max_coords = bounds
+    center = (min_coords + max_coords) / 2
+    max_range = (max_coords - min_coords).max() / 2
+
+    # Set limits with some padding
+    padding = max_range * 0.1
+    ax.set_xlim(center[0] - max_range - padding, center[0] + max_range + padding)
+    ax.set_ylim(center[1] - max_range - padding, center[1] + max_range + padding)
+    ax.set_zlim(center[2] - max_range - padding, center[2] + max_range + padding)
+
+def draw_wireframe(ax, vertices, edges, title, bounds=None, max_edges=None, max_points=None):
+    """
+    Draw a wireframe model onto a 3D axes
+
+    This is the plot of ModelViewer3D without a canvas, so it is shared by
+    the Tk viewer and the offscreen renderers; the caller draws the canvas.
+
+    Args:
+        ax: 3D axes to clear and draw into
+        vertices: Array (N, 3) or None for an empty plot
+        edges: Unique edges (E, 2)
+        title: Axes title
+        bounds: (min, max) of the vertices if already known
+        max_edges, max_points: Decimate to every k-th edge/vertex above these counts
+    """
+    ax.clear()
+
+    if vertices is not None:
+        points = vertices
+        if max_edges is not None:
+            # Прореженная модель: каждое k-е ребро и вершина
+            edges = edges[::max(1, -(-len(edges) // max_edges))]
+        if max_points is not None:
+            points = vertices[::max(1, -(-len(vertices) // max_points))]
+
+        with profiler.section("plot_model.artists"):
+            # Все ребра одной коллекцией линий
+            if len(edges):
+                ax.add_collection3d(Line3DCollection(
+                    vertices[edges],
+                    colors='blue',
+                    linewidths=1.0,
+                    alpha=0.8
+                ))
+
+            # Опционально: рисуем вершины точками
+            ax.scatter(
+                points[:, 0],
+                points[:, 1],
+                points[:, 2],
+                color='red',
+                s=15,
+                alpha=0.6,
+                marker='o'
+            )
+
+        # Calculate bounds for auto-scaling
+        if len(vertices) > 0:
+            if bounds is None:
+                bounds = (vertices.min(axis=0), vertices.max(axis=0))
+            set_axes_limits(ax, bounds)
+
+    ax.set_xlabel('X')
+    ax.set_ylabel('Y')
+    ax.set_zlabel('Z')
+    ax.set_title(title)
+
+    # Устанавливаем прозрачный фон
+    ax.xaxis.set_pane_color((1.0, 1.0, 1.0, 0.0))
+    ax.yaxis.set_pane_color((1.0, 1.0, 1.0, 0.0))
+    ax.zaxis.set_pane_color((1.0, 1.0, 1.0, 0.0))
+
+    # Сетка для лучшей ориентации
+    ax.grid(True, linestyle=':', alpha=0.2)